@@ -1,6 +1,11 @@
 # pylint: skip-file
 import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+from numba import njit
 
 
 class AirDataFrame:
@@ -9,6 +14,60 @@ class AirDataFrame:
     Class fields represent the parsed names of a AirData frame using the AirDataParser class
     """
 
+    __slots__ = (
+        "id",
+        "time",
+        "datetime",
+        "latitude",
+        "longitude",
+        "height_above_takeoff",
+        "height_above_ground_at_drone_location",
+        "ground_elevation_at_drone_location",
+        "altitude_above_seaLevel",
+        "height_sonar",
+        "speed",
+        "distance",
+        "mileage",
+        "satellites",
+        "gpslevel",
+        "voltage",
+        "max_altitude",
+        "max_ascent",
+        "max_speed",
+        "max_distance",
+        "xSpeed",
+        "ySpeed",
+        "zSpeed",
+        "compass_heading",
+        "pitch",
+        "roll",
+        "isPhoto",
+        "isVideo",
+        "rc_elevator",
+        "rc_aileron",
+        "rc_throttle",
+        "rc_rudder",
+        "gimbal_heading",
+        "gimbal_pitch",
+        "gimbal_roll",
+        "battery_percent",
+        "voltageCell1",
+        "voltageCell2",
+        "voltageCell3",
+        "voltageCell4",
+        "voltageCell5",
+        "voltageCell6",
+        "current",
+        "battery_temperature",
+        "altitude",
+        "ascent",
+        "flycStateRaw",
+        "flycState",
+        "message",
+        # properties of AirData files not declared above
+        "__dict__",
+    )
+
     def __init__(self):
         self.id: int = 0
         self.time: int = 0
@@ -60,6 +119,148 @@ class AirDataFrame:
         self.flycState: Optional[str] = None
         self.message: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: all properties of the frame by name (declared ones first)
+        """
+        properties = {key: getattr(self, key) for key in FIELDS}
+        properties.update(self.__dict__)
+        return properties
+
+    def update(self, properties: Dict[str, Any]) -> None:
+        """
+        Sets the given properties of the frame
+        :param properties: values by property name
+        """
+        for key, value in properties.items():
+            setattr(self, key, value)
+
+
+FIELDS: Tuple[str, ...] = tuple(
+    slot for slot in AirDataFrame.__slots__ if slot != "__dict__"
+)
+
+KIND_LINEAR = 0
+KIND_ANGLE = 1
+KIND_LATITUDE = 2
+KIND_LONGITUDE = 3
+
+_ANGLE_KEYS = frozenset(
+    {
+        "compass_heading",
+        "pitch",
+        "roll",
+        "gimbal_heading",
+        "gimbal_pitch",
+        "gimbal_roll",
+    }
+)
+# properties taken from one of the frames instead of being interpolated
+_DONT_INTERPOLATE = frozenset({"isPhoto", "isVideo"})
+
+
+def _kind_of(key: str) -> int:
+    """
+    :param key: property name of a frame
+    :return: the interpolation kind code of the property
+    """
+    if key in _ANGLE_KEYS:
+        return KIND_ANGLE
+    elif key == "latitude":
+        return KIND_LATITUDE
+    elif key == "longitude":
+        return KIND_LONGITUDE
+    return KIND_LINEAR
+
+
+KEY_KIND = np.array([_kind_of(key) for key in FIELDS], dtype=np.int8)
+
+
+@lru_cache(maxsize=None)
+def _key_kinds(keys: Tuple[str, ...]) -> npt.NDArray[np.int8]:
+    """
+    Returns the interpolation kind codes for the given property names (cached, as frames share their properties)
+    :param keys: property names of a frame (in the order of the frame's to_dict)
+    :return: array of kind codes
+    """
+    if keys == FIELDS:
+        return KEY_KIND
+    return np.array([_kind_of(key) for key in keys], dtype=np.int8)
+
+
+@njit(cache=True)
+def _blend(
+    a: npt.NDArray[np.float64],
+    b: npt.NDArray[np.float64],
+    w: float,
+    kinds: npt.NDArray[np.int8],
+    out: npt.NDArray[np.float64],
+) -> None:
+    """
+    Interpolates the numeric values of two frames respecting angular, latitude and longitude wrap-arounds
+    :param a: values of the first frame
+    :param b: values of the second frame
+    :param w: weight of the second frame (value between 0 and 1.0)
+    :param kinds: kind code for every value (see KIND_* constants)
+    :param out: target array of the interpolated values
+    """
+    for i in range(len(a)):
+        value = a[i]
+        other_value = b[i]
+        kind = kinds[i]
+        if kind == KIND_ANGLE:
+            if value > 270 and other_value < 90:
+                to_limit = 360 - value
+                distance = (to_limit + other_value) * w
+                if distance > to_limit:
+                    value = distance - to_limit
+                else:
+                    value += distance
+            elif other_value > 270 and value < 90:
+                distance = (360 - other_value + value) * w
+                if distance > value:
+                    value = 360 - (distance - value)
+                else:
+                    value -= distance
+            else:
+                value = value + (other_value - value) * w
+        elif kind == KIND_LATITUDE:
+            if value < -45 and other_value > 45:
+                to_limit = 90 + value
+                distance = (to_limit + 90 - other_value) * w
+                if value - distance < -90:
+                    value = value - distance + 90
+                else:
+                    value = value - distance
+            elif other_value < -45 and value > 45:
+                distance = (90 - value + 90 + other_value) * w
+                if value + distance > 90:
+                    value = -90 + (value + distance - 90)
+                else:
+                    value += distance
+            else:
+                value = value + (other_value - value) * w
+        elif kind == KIND_LONGITUDE:
+            if value < -90 and other_value > 90:
+                to_limit = 180 + value
+                distance = (to_limit + 180 - other_value) * w
+                if value - distance < -180:
+                    value = abs(value - distance + 180)
+                else:
+                    value = value - distance
+            elif other_value < -90 and value > 90:
+                to_limit = 180 + other_value
+                distance = (to_limit + 180 - value) * w
+                if value + distance > 180:
+                    value = -180 + (value + distance - 180)
+                else:
+                    value += distance
+            else:
+                value = value + (other_value - value) * w
+        else:
+            value = value + (other_value - value) * w
+        out[i] = value
+
 
 def interpolate_frames(
     frame1: AirDataFrame, frame2: AirDataFrame, weight_frame1: float
@@ -72,86 +273,45 @@ def interpolate_frames(
     :return: interpolated frame
     """
     result = AirDataFrame()
-    target = dict()
-    values = frame1.__dict__
-    others = frame2.__dict__
+    values = frame1.to_dict()
+    others = frame2.to_dict()
+    if weight_frame1 == 0:
+        result.update(values)
+        return result
+    elif weight_frame1 == 1:
+        result.update({key: others[key] for key in values})
+        return result
+
+    keys = tuple(values)
+    num_keys = len(keys)
+    a = np.full(num_keys, np.nan)
+    b = np.full(num_keys, np.nan)
+    numeric = []
+    for i, key in enumerate(keys):
+        value = values[key]
+        if isinstance(value, (int, float)):
+            other_value = others[key]
+            a[i] = value
+            if other_value is not None:
+                b[i] = other_value
+            numeric.append(i)
+
+    blended = np.empty(num_keys)
+    _blend(a, b, float(weight_frame1), _key_kinds(keys), blended)
+
+    target = dict(values)
+    for i in numeric:
+        target[keys[i]] = float(blended[i])
     for key, value in values.items():
-        other_value = others[key]
-        if weight_frame1 == 0:
-            target[key] = value
-            continue
-        elif weight_frame1 == 1:
-            target[key] = other_value
-            continue
-        if isinstance(value, int) or isinstance(value, float):
-            if key in [
-                "compass_heading",
-                "pitch",
-                "roll",
-                "gimbal_heading",
-                "gimbal_pitch",
-                "gimbal_roll",
-            ]:
-                if value > 270 and other_value < 90:
-                    to_limit = 360 - value
-                    distance = (to_limit + other_value) * weight_frame1
-                    if distance > to_limit:
-                        value = distance - to_limit
-                    else:
-                        value += distance
-                elif other_value > 270 and value < 90:
-                    distance = (360 - other_value + value) * weight_frame1
-                    if distance > value:
-                        value = 360 - (distance - value)
-                    else:
-                        value -= distance
-                else:
-                    value = value + (other_value - value) * weight_frame1
-            elif key == "latitude":
-                if value < -45 and other_value > 45:
-                    to_limit = 90 + value
-                    distance = (to_limit + 90 - other_value) * weight_frame1
-                    if value - distance < -90:
-                        value = value - distance + 90
-                    else:
-                        value = value - distance
-                elif other_value < -45 and value > 45:
-                    distance = (90 - value + 90 + other_value) * weight_frame1
-                    if value + distance > 90:
-                        value = -90 + (value + distance - 90)
-                    else:
-                        value += distance
-                else:
-                    value = value + (other_value - value) * weight_frame1
-            elif key == "longitude":
-                if value < -90 and other_value > 90:
-                    to_limit = 180 + value
-                    distance = (to_limit + 180 - other_value) * weight_frame1
-                    if value - distance < -180:
-                        value = abs(value - distance + 180)
-                    else:
-                        value = value - distance
-                elif other_value < -90 and value > 90:
-                    to_limit = 180 + other_value
-                    distance = (to_limit + 180 - value) * weight_frame1
-                    if value + distance > 180:
-                        value = -180 + (value + distance - 180)
-                    else:
-                        value += distance
-                else:
-                    value = value + (other_value - value) * weight_frame1
-            else:
-                value = value + (other_value - value) * weight_frame1
-        elif isinstance(value, datetime.datetime):
-            value = value + (other_value - value) * weight_frame1
+        if isinstance(value, datetime.datetime):
+            target[key] = value + (others[key] - value) * weight_frame1
 
         # for strings take the previous frame's value (except weight == 1)
-        dont_interpolate = isinstance(value, str) or key in ["isPhoto", "isVideo"]
+        dont_interpolate = isinstance(value, str) or key in _DONT_INTERPOLATE
         if weight_frame1 < 1 and dont_interpolate:
-            value = values[key]
+            target[key] = value
         elif dont_interpolate:
-            value = other_value
-        target[key] = value
+            target[key] = others[key]
 
-    result.__dict__ = target
+    result.update(target)
     return result
@@ -1,14 +1,109 @@
 # pylint: disable=R0201
 import datetime
 from io import TextIOBase
-from typing import List, Optional, TextIO, Union
+from typing import Any, Dict, List, Optional, TextIO, Tuple, Union
 
 import numpy as np
 import numpy.typing as npt
-from scipy import interpolate
+from dateutil import tz
+from numba import njit
 
-from rarf.air_data.air_data_frame import AirDataFrame
-from rarf.air_data.air_data_parser import AirDataParser
+from rarf.air_data.air_data_frame import _DONT_INTERPOLATE, AirDataFrame
+from rarf.air_data.air_data_parser import AirDataParser, to_datetime64
+
+# angles unwrapped before the time interpolation; unlike the _ANGLE_KEYS of
+# interpolate_frames, this has always included gimbal_yaw but not the pitch and roll
+# of the aircraft, so the set is kept separate
+_UNWRAPPED_ANGLE_KEYS = frozenset(
+    {
+        "compass_heading",
+        "gimbal_pitch",
+        "gimbal_yaw",
+        "gimbal_roll",
+        "gimbal_heading",
+    }
+)
+
+
+def _first_value(values: Union[List[Any], npt.NDArray[Any]]) -> Any:
+    """
+    :param values: values of a property (list or column array)
+    :return: the first value as Python object (None for NaN or NaT, datetimes of datetime64 arrays in UTC)
+    """
+    value = values[0]
+    if isinstance(values, np.ndarray):
+        if values.dtype.kind == "M":
+            if np.isnat(value):
+                return None
+            return value.astype("datetime64[us]").item().replace(tzinfo=tz.tzutc())
+        elif values.dtype.kind == "f":
+            return None if np.isnan(value) else float(value)
+        elif values.dtype.kind in "iu":
+            return int(value)
+    return value
+
+
+def _as_float64(values: Union[List[Any], npt.NDArray[Any]]) -> npt.NDArray[np.float64]:
+    """
+    :param values: numeric values of a property (list or column array)
+    :return: float64 array of the values (NaN for None)
+    """
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    return np.array(
+        [np.nan if value is None else value for value in values], dtype=np.float64
+    )
+
+
+def _as_datetime64(
+    values: Union[List[Any], npt.NDArray[Any]]
+) -> npt.NDArray[np.datetime64]:
+    """
+    :param values: datetime values of a property (list or column array)
+    :return: datetime64[us] array of the values (NaT for None)
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values.astype("datetime64[us]", copy=False)
+    return to_datetime64(values)
+
+
+def _seconds_since(
+    times: npt.NDArray[np.datetime64], origin: np.datetime64
+) -> npt.NDArray[np.float64]:
+    """
+    :param times: datetimes with microsecond precision
+    :param origin: reference datetime with microsecond precision
+    :return: seconds between the origin and the datetimes (NaN for NaT)
+    """
+    delta = times - origin
+    seconds = delta.astype(np.float64) / 1e6
+    seconds[np.isnat(delta)] = np.nan
+    return seconds
+
+
+@njit(cache=True)
+def _interp_extrapolate(
+    x: npt.NDArray[np.float64], xp: npt.NDArray[np.float64], fp: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Linear interpolation like np.interp, but linearly extrapolating beyond both ends of xp
+    :param x: The x-coordinates of the interpolated values.
+    :param xp: The (increasing) x-coordinates of the data points (at least two).
+    :param fp: The y-coordinates of the data points.
+    :return: The interpolated values.
+    """
+    y = np.interp(x, xp, fp)
+
+    dx_left = xp[1] - xp[0]
+    dx_right = xp[-1] - xp[-2]
+    slope_left = (fp[1] - fp[0]) / dx_left if dx_left != 0 else 0.0
+    slope_right = (fp[-1] - fp[-2]) / dx_right if dx_right != 0 else 0.0
+    for i in range(len(x)):
+        if x[i] < xp[0]:
+            y[i] = fp[0] + slope_left * (x[i] - xp[0])
+        elif x[i] > xp[-1]:
+            y[i] = fp[-1] + slope_right * (x[i] - xp[-1])
+    return y
 
 
 def interpolate_property(
@@ -23,7 +118,7 @@ def interpolate_property(
     :param x: The x-coordinates of the interpolated values.
     :param xp: The x-coordinates of the data points.
     :param ad_frames: The data points (as dicts or AirDataFrames) to interpolate from.
-    :param prop: The property of the __dict__ to interpolate.
+    :param prop: The property to interpolate.
     :param period: A period for the x-coordinates. This parameter allows the proper interpolation of angular x-coordinates (e.g. 360°)
 
     :return The interpolated values.
@@ -45,7 +140,7 @@ def interpolate_property(
         s = fp_prop[0]
 
         # convert fp_prop to seconds
-        fp_prop = np.array([(t - s).total_seconds() for t in fp_prop], dtype=float)
+        fp_prop = np.array([(t - s).total_seconds() for t in fp_prop])
         # from_np converts seconds back to datetime
 
         def from_np(delta):
@@ -53,15 +148,14 @@ def interpolate_property(
                 delta = 0.0
             return s + datetime.timedelta(seconds=delta)
 
+    fp_prop = np.asarray(fp_prop, dtype=np.float64)
     if period is not None:
         fp_prop = np.unwrap(fp_prop, period=period)
 
-    # using scipy interpolation (supports extrapolation)
-    inter_prop = interpolate.interp1d(
-        np.asarray(xp, dtype=float), fp_prop, kind="linear", fill_value="extrapolate"
-    )(
-        np.asarray(x, dtype=float)
-    )  # create interpolator and directly apply it
+    # linear interpolation (supports extrapolation)
+    inter_prop = _interp_extrapolate(
+        np.asarray(x, dtype=np.float64), np.asarray(xp, dtype=np.float64), fp_prop
+    )
 
     if period is not None:
         inter_prop = np.mod(inter_prop, period)
@@ -93,56 +187,159 @@ class AirDataTimeInterpolator:
                     "All frames must have a datetime of type datetime.datetime"
                 )
 
+        first_frame = self.frames[0].to_dict()
+        self._init_columns(
+            {key: [getattr(frame, key) for frame in self.frames] for key in first_frame}
+        )
+
+    @classmethod
+    def from_columns(
+        cls, columns: Dict[str, npt.NDArray[Any]]
+    ) -> "AirDataTimeInterpolator":
+        """
+        Creates an interpolator from column arrays (see AirDataParser.parse_columns) without creating AirDataFrames
+        The frames attribute of the created interpolator is None
+        :param columns: arrays by property name, datetime columns must be datetime64 arrays in UTC
+        :return: the created interpolator
+        """
+        if "datetime" not in columns or np.isnat(columns["datetime"]).any():
+            raise ValueError("All frames must have a datetime of type datetime64")
+
+        interpolator = cls.__new__(cls)
+        interpolator.frames = None
+        interpolator._init_columns(columns)
+        return interpolator
+
+    def _init_columns(
+        self, columns: Dict[str, Union[List[Any], npt.NDArray[Any]]]
+    ) -> None:
+        """
+        Prepares the interpolation of the given properties
+        :param columns: values of all frames by property name, either as lists or as arrays
+        """
+        # partition the properties once based on the first frame
+        first_frame = {key: _first_value(values) for key, values in columns.items()}
+        self._numeric_keys: List[str] = []
+        self._datetime_keys: List[str] = []
+        for key, value in first_frame.items():
+            if isinstance(value, datetime.datetime):
+                self._datetime_keys.append(key)
+            elif isinstance(value, (int, float)):
+                self._numeric_keys.append(key)
+        # for strings and other props take the first frame's value
+        self._passthrough: Dict[str, Any] = {
+            key: value
+            for key, value in first_frame.items()
+            if key not in self._numeric_keys and key not in self._datetime_keys
+        }
+        self._datetime_origins: List[datetime.datetime] = [
+            first_frame[key] for key in self._datetime_keys
+        ]
+
         # use first frame's datetime as start time
-        self.start: datetime.datetime = self.frames[0].datetime
+        self.start: datetime.datetime = first_frame["datetime"]
 
         # precompute (for speed)
-        self.seconds = np.array(
-            [(ad.datetime - self.start).total_seconds() for ad in self.frames]
+        self._start64 = to_datetime64([self.start])[0]
+        self.seconds = _seconds_since(
+            _as_datetime64(columns["datetime"]), self._start64
         )
 
+        # materialize all interpolated properties as one (frames x properties) matrix
+        # datetimes are stored as seconds relative to the first frame's value
+        num_frames = len(self.seconds)
+        num_numeric = len(self._numeric_keys)
+        self._mat = np.empty(
+            (num_frames, num_numeric + len(self._datetime_keys)), dtype=np.float64
+        )
+        for col, key in enumerate(self._numeric_keys):
+            self._mat[:, col] = _as_float64(columns[key])
+        for col, (key, origin) in enumerate(
+            zip(self._datetime_keys, self._datetime_origins), start=num_numeric
+        ):
+            self._mat[:, col] = _seconds_since(
+                _as_datetime64(columns[key]), to_datetime64([origin])[0]
+            )
+
+        self._angle_cols = [
+            idx
+            for idx, key in enumerate(self._numeric_keys)
+            if key in _UNWRAPPED_ANGLE_KEYS
+        ]
+        self._binary_cols = [
+            idx
+            for idx, key in enumerate(self._numeric_keys)
+            if key in _DONT_INTERPOLATE
+        ]
+        if self._angle_cols:
+            # we deal with angles (in degrees), so we need to unwrap them
+            self._mat[:, self._angle_cols] = np.unwrap(
+                self._mat[:, self._angle_cols], period=360, axis=0
+            )
+
+    def _to_seconds(self, time: List[datetime.datetime]) -> npt.NDArray[np.float64]:
+        """
+        :param time: datetimes to convert
+        :return: contiguous float64 array of the seconds relative to the start time
+        """
+        return _seconds_since(to_datetime64(time), self._start64)
+
+    def _interpolation_weights(
+        self, x_seconds: npt.NDArray[np.float64]
+    ) -> Tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]:
+        """
+        Locates the given times between the frames (requires at least two frames)
+        :param x_seconds: times in seconds relative to the start time
+        :return: index of the preceding frame and the weight of the following frame for every time
+        """
+        idx = np.clip(
+            np.searchsorted(self.seconds, x_seconds, side="right") - 1,
+            0,
+            len(self.seconds) - 2,
+        )
+        x0 = self.seconds[idx]
+        dx = self.seconds[idx + 1] - x0
+        w = np.divide(x_seconds - x0, dx, out=np.zeros_like(x_seconds), where=dx != 0)
+        return idx, w
+
     def __call__(
         self, time: Union[datetime.datetime, List[datetime.datetime]]
     ) -> List[AirDataFrame]:
         if not isinstance(time, list):
             time = [time]
 
-        x_seconds = np.array([(t - self.start).total_seconds() for t in time])
+        x_seconds = self._to_seconds(time)
 
-        targets = [AirDataFrame() for _ in range(len(time))]
-        first_frame = self.frames[0].__dict__
-        for key, value in first_frame.items():
-            period = None
-            if key in [
-                "compass_heading",
-                "gimbal_pitch",
-                "gimbal_yaw",
-                "gimbal_roll",
-                "gimbal_heading",
-            ]:
-                period = (
-                    360  # we deal with angles (in degrees), so we need to unwrap them
-                )
+        if len(self.seconds) == 1:
+            values = np.repeat(self._mat, len(time), axis=0)
+        else:
+            # linear interpolation between the enclosing frames (extrapolates beyond both ends)
+            idx, w = self._interpolation_weights(x_seconds)
+            lower = self._mat[idx]
+            values = lower + (self._mat[idx + 1] - lower) * w[:, None]
 
-            if (
-                isinstance(value, int)
-                or isinstance(value, float)
-                or isinstance(value, datetime.datetime)
-            ):
-                value = interpolate_property(
-                    x_seconds, self.seconds, self.frames, key, period=period
-                )
-            else:
-                # for strings and other props take the first frame's value
-                value = [first_frame[key]] * len(time)
+        if self._angle_cols:
+            values[:, self._angle_cols] = np.mod(values[:, self._angle_cols], 360)
 
-            # for isPhoto and isVideo, convert to binary (0 or 1)
-            dont_interpolate = key in ["isPhoto", "isVideo"]
-            if dont_interpolate:
-                value = np.array(value)
-                value[value > 0] = 1
+        # for isPhoto and isVideo, convert to binary (0 or 1)
+        for col in self._binary_cols:
+            binary = values[:, col]
+            binary[binary > 0] = 1
+
+        num_numeric = len(self._numeric_keys)
+        targets = []
+        for row in values.tolist():
+            properties = dict(self._passthrough)
+            properties.update(zip(self._numeric_keys, row))
+            for key, origin, delta in zip(
+                self._datetime_keys, self._datetime_origins, row[num_numeric:]
+            ):
+                if np.isnan(delta):
+                    delta = 0.0
+                properties[key] = origin + datetime.timedelta(seconds=delta)
 
-            for iv, target in enumerate(targets):
-                setattr(target, key, value[iv])
+            target = AirDataFrame()
+            target.update(properties)
+            targets.append(target)
 
-        return targets
\ No newline at end of file
+        return targets
@@ -1,29 +1,102 @@
 # pylint: disable=R0201
 import csv
 import datetime
-import sys
+import os
 from abc import ABC, abstractmethod
 from io import TextIOBase
-from typing import Any, Dict, Generator, List, Optional, TextIO, Union, Iterable
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 
+import numpy as np
+import numpy.typing as npt
 from dateutil import tz
 
 from rarf.air_data.air_data_frame import AirDataFrame
 
-maxInt = None
+# Fix csv problem with large fields (source https://stackoverflow.com/a/15063941)
+# 2^31 - 1 is the largest limit supported on all platforms (C long is 32 bit on Windows)
+try:
+    csv.field_size_limit(2**31 - 1)
+except OverflowError:
+    csv.field_size_limit(2**28)
 
-if maxInt is None:
-    # Fix csv problem with large fields (source https://stackoverflow.com/a/15063941)
-    maxInt = sys.maxsize
-    while True:
-        # decrease the maxInt value by factor 10
-        # as long as the OverflowError occurs.
+# number of bytes read from the head and the tail of a file to find its first and last frame
+TAIL_READ_SIZE = 8192
 
-        try:
-            csv.field_size_limit(maxInt)
-            break
-        except OverflowError:
-            maxInt = int(maxInt / 10)
+
+_UTC = tz.tzutc()
+
+
+def _parse_utc(value: str) -> datetime.datetime:
+    """
+    Parses a date-time string of an AirData file ("%Y-%m-%d %H:%M:%S", AirData Files are always in UTC)
+    Zero-padded values are sliced directly, as strptime is comparatively slow
+    :param value: date-time string
+    :return: the parsed date-time in UTC
+    """
+    if (
+        len(value) == 19
+        and value[4] == "-"
+        and value[7] == "-"
+        and value[10] == " "
+        and value[13] == ":"
+        and value[16] == ":"
+    ):
+        return datetime.datetime(
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+            tzinfo=_UTC,
+        )
+    return datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=_UTC)
+
+
+def to_datetime64(
+    times: Iterable[Optional[datetime.datetime]],
+) -> npt.NDArray[np.datetime64]:
+    """
+    :param times: datetimes to convert (timezone aware datetimes are converted to UTC, None to NaT)
+    :return: array of the datetimes with microsecond precision
+    """
+    return np.array(
+        [
+            t
+            if t is None or t.tzinfo is None
+            else t.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            for t in times
+        ],
+        dtype="datetime64[us]",
+    )
+
+
+def _to_column_array(values: List[Any]) -> npt.NDArray[Any]:
+    """
+    :param values: parsed values of a column
+    :return: float64 array for numeric columns, datetime64[us] array for datetime columns, otherwise object array
+    """
+    present = [value for value in values if value is not None]
+    if len(present) > 0 and all(isinstance(value, (int, float)) for value in present):
+        return np.array(
+            [np.nan if value is None else value for value in values], dtype=np.float64
+        )
+    elif len(present) > 0 and all(
+        isinstance(value, datetime.datetime) for value in present
+    ):
+        return to_datetime64(values)
+    return np.array(values, dtype=object)
 
 
 class AirDataParserInterface(ABC):
@@ -32,18 +105,18 @@ class AirDataParserInterface(ABC):
     """
 
     @abstractmethod
-    def parse_yield(
+    def _parse_rows(
         self,
         file: Union[str, TextIO, TextIOBase],
         skip: int = 0,
         limit: Optional[int] = None,
-    ) -> Generator[AirDataFrame, None, None]:
+    ) -> Generator[Tuple[int, List[str], List[Any]], None, None]:
         """
-        Method used to parse an AirData file, which will call the callback
+        Method used to parse the rows of an AirData file
         :param file: path or file pointer of the airdata file
-        :param skip: Skip the first n frames and don't call the callback
+        :param skip: Skip the first n frames
         :param limit: Break reading frames after m frames
-        :return:
+        :return: Generator of the frame id, the column names and the converted values of every row
         """
         pass
 
@@ -92,18 +165,76 @@ class AirDataParser(AirDataParserInterface):
                 f"File must be either a string or a file pointer not from Type: {type(file)}"
             )
 
-    def parse_yield(
+    @staticmethod
+    def _get_unit_converter(
+        unit: Optional[str],
+    ) -> Optional[Callable[[Union[int, float]], Union[int, float]]]:
+        """
+        :param unit: unit of a column (if any)
+        :return: function converting a numeric value of the given unit to the metric system (None if not necessary)
+        """
+        if unit is not None and unit.lower() == "feet":
+            return lambda value: value / 3.28  # conversion from feet to meter
+        elif unit is not None and unit.lower() == "mph":
+            return lambda value: value * 1.6093  # conversion from mph to kmh
+        return None
+
+    def _convert_value(self, value: str, unit: Optional[str]) -> Any:
+        """
+        Converts a single (non-empty) value, trying to find out which data type should be used
+        :param value: stripped value of a cell
+        :param unit: unit of the cell's column (if any)
+        :return: int/float, datetime or string representation of the given value
+        """
+        # if column is a valid digit convert it to a float or an integer, depending on a contained dot
+        if value.lower().replace(".", "").replace("-", "").replace("e", "").isdigit():
+            if "." in value:
+                number = float(value)
+            else:
+                number = int(value)
+            to_metric = self._get_unit_converter(unit)
+            return number if to_metric is None else to_metric(number)
+        # otherwise check if it can be parsed to a datetime object and if not just use it as a string
+        if not value[0].isdigit():
+            return value
+        try:
+            return _parse_utc(value)
+        except Exception:
+            return value
+
+    def _get_converter(
+        self, value: str, unit: Optional[str]
+    ) -> Callable[[str], Any]:
+        """
+        Creates the converter of a column based on its first (non-empty) value
+        Converters raise a ValueError if a value does not match the column's data type
+        :param value: stripped first value of the column
+        :param unit: unit of the column (if any)
+        :return: converter function for the values of the column
+        """
+        converted = self._convert_value(value, unit)
+        if isinstance(converted, (int, float)):
+            to_metric = self._get_unit_converter(unit)
+            if to_metric is None:
+                return lambda v: float(v) if "." in v else int(v)
+            return lambda v: to_metric(float(v) if "." in v else int(v))
+        elif isinstance(converted, datetime.datetime):
+            return _parse_utc
+        # strings may contain anything, so keep checking every value
+        return lambda v: self._convert_value(v, unit)
+
+    def _parse_rows(
         self,
         file: Union[str, TextIO, TextIOBase],
         skip: int = 0,
         limit: Optional[int] = None,
-    ) -> Generator[AirDataFrame, None, None]:
+    ) -> Generator[Tuple[int, List[str], List[Any]], None, None]:
         """
-        Method used to parse an AirData file, which will call the callback
+        Method used to parse the rows of an AirData file
         :param file: path or file pointer of the airdata file
-        :param skip: Skip the first n frames and don't call the callback
+        :param skip: Skip the first n frames
         :param limit: Break reading frames after m frames
-        :return:
+        :return: Generator of the frame id, the column names and the converted values of every row
         """
         # get a file_pointer if necessary
         file_pointer = self._ensure_file_pointer(file)
@@ -127,6 +258,9 @@ class AirDataParser(AirDataParserInterface):
                         units[val] = unit
                     else:
                         headers.append(column.strip())
+                converters: List[Optional[Callable[[str], Any]]] = [None] * len(
+                    headers
+                )
                 continue
             frame_id += 1
             if frame_id < skip:
@@ -134,58 +268,90 @@ class AirDataParser(AirDataParserInterface):
 
             # first row already found -> process the data
             converted: List[Any] = []
-            for i, column2 in enumerate(row):
+            for i, (column2, converter) in enumerate(zip(row, converters)):
                 # clean up value
                 column2 = column2.strip()
-                if i >= len(headers):
-                    continue
-                header = headers[i]
-                unit2 = units.get(header)
 
-                # try to find out which data type should be used
                 # if column is empty use None
                 if len(column2) == 0:
                     converted.append(None)
-                # if column is a valid digit convert it to a float or an integer, depending on a contained dot
-                elif (
-                    column2.lower()
-                    .replace(".", "")
-                    .replace("-", "")
-                    .replace("e", "")
-                    .isdigit()
-                ):
-                    if "." in column2:
-                        value = float(column2)
-                    else:
-                        value = int(column2)
-                    if unit2 is not None and unit2.lower() == "feet":
-                        value /= 3.28  # conversion from feet to meter
-                    elif unit2 is not None and unit2.lower() == "mph":
-                        value *= 1.6093  # conversion from mph to kmh
-                    converted.append(value)
-                # otherwise check if it can be parsed to a datetime object and if not just use it as a string
-                else:
-                    try:
-                        dt = datetime.datetime.strptime(
-                            column2, "%Y-%m-%d %H:%M:%S"
-                        ).replace(
-                            tzinfo=tz.tzutc()
-                        )  # AirData Files are always in UTC
-                        converted.append(dt)
-                    except Exception:
-                        converted.append(column2)
-
-            # create AirDataFrame object using __dict__ based reflection
-            current_object = AirDataFrame()
-            current_object.__dict__ = dict(zip(headers, converted))
-            current_object.id = frame_id
-            yield current_object
+                    continue
+
+                # the data type of a column is decided once based on its first non-empty value
+                if converter is None:
+                    converter = converters[i] = self._get_converter(
+                        column2, units.get(headers[i])
+                    )
+                try:
+                    converted.append(converter(column2))
+                except ValueError:
+                    # value does not match the column's data type
+                    converted.append(
+                        self._convert_value(column2, units.get(headers[i]))
+                    )
+
+            yield frame_id, headers, converted
             if limit is not None and frame_id == skip + limit - 1:
                 break
 
         if isinstance(file, str):
             file_pointer.close()
 
+    def parse_yield(
+        self,
+        file: Union[str, TextIO, TextIOBase],
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> Generator[AirDataFrame, None, None]:
+        """
+        Method used to parse an AirData file, which will call the callback
+        :param file: path or file pointer of the airdata file
+        :param skip: Skip the first n frames and don't call the callback
+        :param limit: Break reading frames after m frames
+        :return:
+        """
+        for frame_id, headers, converted in self._parse_rows(file, skip, limit):
+            # create AirDataFrame object using attribute based reflection
+            current_object = AirDataFrame()
+            for header, value in zip(headers, converted):
+                setattr(current_object, header, value)
+            current_object.id = frame_id
+            yield current_object
+
+    def parse_columns(
+        self,
+        file: Union[str, TextIO, TextIOBase],
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> Dict[str, npt.NDArray[Any]]:
+        """
+        Method for parsing an AirData file into one array per column instead of one AirDataFrame per row
+        Numeric columns are float64 arrays (NaN if empty), datetime columns datetime64[us] arrays in UTC (NaT if empty)
+        and all other columns object arrays
+        :param file: path or file pointer of the airdata file
+        :param skip: Skip the first n frames
+        :param limit: Break reading frames after m frames
+        :return: arrays by column name (including the frame ids as "id")
+        """
+        headers: List[str] = []
+        values: List[List[Any]] = []
+        ids: List[int] = []
+        for frame_id, headers, converted in self._parse_rows(file, skip, limit):
+            if not values:
+                values = [[] for _ in headers]
+            for column, value in zip(values, converted):
+                column.append(value)
+            # rows may be shorter than the header
+            for column in values[len(converted) :]:
+                column.append(None)
+            ids.append(frame_id)
+
+        columns = {
+            header: _to_column_array(column) for header, column in zip(headers, values)
+        }
+        columns["id"] = np.array(ids, dtype=np.int64)
+        return columns
+
     def get_video_offset(
         self, file: Union[str, TextIO, TextIOBase], video_time: datetime.datetime
     ) -> int:
@@ -227,6 +393,35 @@ class AirDataParser(AirDataParserInterface):
 
         return ms_offset
 
+    def _read_first_and_last_row(self, path: str) -> Optional[tuple[list[str], list[str]]]:
+        """
+        Reads the first and the last data row of an AirData file by only reading its head and tail.
+        :param path: The path of the file.
+        :return: The first and last data row, or ``None`` if they could not be determined from head and tail.
+        """
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size <= 2 * TAIL_READ_SIZE:
+                return None
+            f.seek(0)
+            head = f.read(TAIL_READ_SIZE)
+            f.seek(-TAIL_READ_SIZE, os.SEEK_END)
+            tail = f.read()
+
+        # the head must contain the complete header and first data row
+        head_lines = head.split(b"\n", 2)
+        # the tail must contain the complete last data row
+        tail_lines = tail.rstrip(b"\r\n").rsplit(b"\n", 1)
+        if len(head_lines) < 3 or len(tail_lines) < 2:
+            return None
+
+        first_row, last_row = csv.reader(
+            [head_lines[1].decode("UTF-8"), tail_lines[1].decode("UTF-8")],
+            delimiter=self.delimiter,
+            quotechar=self.quotechar,
+        )
+        return first_row, last_row
+
     def get_start_and_end(self, file: Union[str, TextIO, TextIOBase]) -> Optional[tuple[datetime, datetime]]:
         """
         Extracts the first and last UTC date time from the given AirData file.
@@ -234,6 +429,13 @@ class AirDataParser(AirDataParserInterface):
         :return: If no date-time information could be retrieved ``None``; otherwise the date-time data of the first and
         last frame in UTC.
         """
+        if isinstance(file, str):
+            # only read head and tail of the file instead of parsing all rows
+            rows = self._read_first_and_last_row(file)
+            if rows is not None:
+                first_row, last_row = rows
+                return _parse_utc(first_row[1]), _parse_utc(last_row[1])
+
         file_pointer = self._ensure_file_pointer(file)
 
         start_date_utc = None
@@ -243,14 +445,10 @@ class AirDataParser(AirDataParserInterface):
             next(reader)  # skip header
             for row in reader:
                 if start_date_utc is None:
-                    date_str = row[1]
-                    start_date_utc = datetime.datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                    start_date_utc = start_date_utc.replace(tzinfo=tz.tzutc())
+                    start_date_utc = _parse_utc(row[1])
                     continue
                 last_date_str = row[1]
         if last_date_str is None:
             return None
         else:
-            end_date_utc = datetime.datetime.strptime(last_date_str, "%Y-%m-%d %H:%M:%S")
-            end_date_utc = end_date_utc.replace(tzinfo=tz.tzutc())
-            return start_date_utc, end_date_utc
+            return start_date_utc, _parse_utc(last_date_str)
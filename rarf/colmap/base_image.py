@@ -1,20 +1,24 @@
 from dataclasses import dataclass
 from typing import Any
 
-from rarf.colmap.point import Vector4, Vector3, Point2D
+import numpy as np
+from numpy import typing as npt
+
+from rarf.colmap.point import Vector4, Vector3
 
 
 @dataclass(frozen=True)
 class BaseImage:
     """
     Class representing one entry in a Colmap reconstruction images file.
+    The 2D points are stored as a structured array of ``POINT2D_DTYPE``.
     """
     identifier: int
     r_quat: Vector4
     t_vec: Vector3
     camera_id: int
     name: str
-    points2D: list[Point2D]
+    points2D: npt.NDArray
 
     def __eq__(self, other: Any) -> bool:
         return isinstance(other, BaseImage) and \
@@ -23,4 +27,4 @@ class BaseImage:
                self.t_vec == other.t_vec and \
                self.camera_id == other.camera_id and \
                self.name == other.name and \
-               all(pa == pb for pa, pb in zip(self.points2D, other.points2D))
+               np.array_equal(self.points2D, other.points2D)
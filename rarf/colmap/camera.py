@@ -1,5 +1,9 @@
 from dataclasses import dataclass
-from typing import Any, Sequence
+from functools import cached_property
+from typing import Any, Union
+
+import numpy as np
+from numpy import typing as npt
 
 
 @dataclass(frozen=True)
@@ -21,7 +25,7 @@ class Camera:
     model: CameraModel
     width: int
     height: int
-    params: Sequence[float]
+    params: Union[npt.NDArray, tuple[float, ...]]
 
     def __eq__(self, other: Any) -> bool:
         return isinstance(other, Camera) and \
@@ -29,4 +33,11 @@ class Camera:
                self.model == other.model and \
                self.width == other.width and \
                self.height == other.height and \
-               all(pa == pb for pa, pb in zip(self.params, other.params))
+               np.array_equal(self.params, other.params)
+
+    @cached_property
+    def params_array(self) -> npt.NDArray:
+        """
+        :return: The parameters as an array (cameras read from binary files keep them as a tuple).
+        """
+        return np.asarray(self.params, dtype=np.float64)
@@ -12,6 +12,9 @@ from rarf.geo.coordinate_system import CoordinateSystem
 from rarf.geo.direction import Direction
 
 MATCHED_POSES_SYSTEM: Final[CoordinateSystem] = CoordinateSystem(Direction.RIGHT, Direction.DOWN, Direction.BACKWARD)
+# the conversion between two constant coordinate systems is a constant signed permutation matrix
+COLMAP_TO_NERFSTUDIO_MAT: Final[np.ndarray] = CoordinateSystem.colmap().convert_func(
+    CoordinateSystem.nerfstudio_world())(np.identity(3))
 
 
 def opencv_to_camera(data: dict, identifier: int = 0) -> Camera:
@@ -35,7 +38,7 @@ def opencv_to_camera(data: dict, identifier: int = 0) -> Camera:
         dist = np.pad(dist, (0, 4 - dist_count), "constant", constant_values=(0.0, 0.0))
     dist = dist[:4]
 
-    params = [fx, fy, cx, cy, *dist]
+    params = np.array([fx, fy, cx, cy, *dist])
     width = data["width"]
     height = data["height"]
     model = CAMERA_MODEL_BY_NAME["OPENCV"]
@@ -84,33 +87,25 @@ def colmap_to_nerfstudio(camera_file: str, image_file: str, output_dir: str, ima
         images = read_images_text(image_path)
     images_root_path = Path(images_root)
 
-    conv_function = CoordinateSystem.colmap().convert_func(CoordinateSystem.nerfstudio_world())
-
-    frames = []
-    for image in images:
-        r_quat = image.r_quat
-        r_quat = [r_quat[1], r_quat[2], r_quat[3], r_quat[0]]  # convert back to X, Y, Z, W order
-        r_mat = Rotation.from_quat(r_quat).as_matrix()
-
-        t_vec = np.array(image.t_vec)
-
-        r_mat = conv_function(r_mat)
-        t_vec = conv_function(t_vec)
-
-        c2w = np.identity(4)
-        c2w[:3, :3] = r_mat
-        c2w[:3, 3] = t_vec
-
-        name = images_root_path / image.name
-
-        frame = {
-            "file_path": name.as_posix(),
-            "transform_matrix": c2w.tolist()
-        }
-
-        frames.append(frame)
-
-    out_dict["frames"] = frames
+    conv_mat = COLMAP_TO_NERFSTUDIO_MAT
+
+    num_images = len(images)
+    c2w = np.broadcast_to(np.identity(4), (num_images, 4, 4)).copy()
+    if num_images > 0:
+        r_quats = np.array([image.r_quat for image in images], dtype=float)[:, [1, 2, 3, 0]]  # X, Y, Z, W order
+        r_mats = Rotation.from_quat(r_quats).as_matrix()
+        t_vecs = np.array([image.t_vec for image in images], dtype=float)
+
+        c2w[:, :3, :3] = np.einsum("ij,mjk->mik", conv_mat, r_mats)
+        c2w[:, :3, 3] = t_vecs @ conv_mat.T
+
+    # joining a path to "." drops the dot and anchors such as "/" already end with a separator
+    images_root_posix = images_root_path.as_posix()
+    images_root_prefix = "" if images_root_posix == "." else images_root_posix.rstrip("/") + "/"
+    out_dict["frames"] = [
+        {"file_path": images_root_prefix + image.name, "transform_matrix": transform_matrix}
+        for image, transform_matrix in zip(images, c2w.tolist())
+    ]
 
     output_dir = Path(output_dir)
     with open(output_dir / "transforms.json", "w", encoding="utf-8") as jf:
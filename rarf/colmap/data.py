@@ -1,11 +1,17 @@
-from typing import Sequence, Final
+import mmap
+import struct
+from contextlib import contextmanager
+from typing import Sequence, Final, Iterator
 
 import numpy as np
+from numba import njit, types
+from numpy import typing as npt
+from numpy.lib import recfunctions
 
 from rarf.colmap.base_image import BaseImage
 from rarf.colmap.camera import CameraModel, Camera
-from rarf.colmap.point import Point2D, Vector4, Vector3, Point3D, IntVector3
-from rarf.util.io import write_bytes, read_bytes, read_string
+from rarf.colmap.point import POINT2D_DTYPE, TRACK_DTYPE, Vector4, Vector3, Point3D, create_points2D
+from rarf.colmap.point_array import Point3DArray
 from rarf.util.types import Pathable
 
 CAMERA_MODELS: Final[set[CameraModel]] = {
@@ -24,6 +30,81 @@ CAMERA_MODELS: Final[set[CameraModel]] = {
 CAMERA_MODEL_BY_ID: Final[dict[int, CameraModel]] = {camera_model.model_id: camera_model for camera_model in CAMERA_MODELS}
 CAMERA_MODEL_BY_NAME: Final[dict[str, CameraModel]] = {camera_model.model_name: camera_model for camera_model in CAMERA_MODELS}
 
+# fixed size part of an image entry preceding its name in the binary Colmap image format
+_IMAGE_HEADER_DTYPE: Final[np.dtype] = np.dtype([("image_id", "<u4"), ("qvec", "<f8", 4), ("tvec", "<f8", 3),
+                                                 ("camera_id", "<u4")])
+_COUNT: Final[struct.Struct] = struct.Struct("<Q")
+# binary files consist of many small records, so they are written through a larger buffer than the default
+_WRITE_BUFFER_SIZE: Final[int] = 1 << 20
+# fixed size part of an image entry preceding its name, matching _IMAGE_HEADER_DTYPE
+_IMAGE_HEADER: Final[struct.Struct] = struct.Struct("<I4d3dI")
+# fixed size part of a camera entry preceding its parameters in the binary Colmap camera format
+_CAMERA_HEADER: Final[struct.Struct] = struct.Struct("<IiQQ")
+# parameters of a camera entry by number of parameters of the camera model
+_CAMERA_PARAMS: Final[dict[int, struct.Struct]] = {
+    num_params: struct.Struct(f"<{num_params}d") for num_params in {model.num_params for model in CAMERA_MODELS}
+}
+# fixed size part of a point3D entry preceding its track in the binary Colmap point3D format
+_POINT3D_HEADER_DTYPE: Final[np.dtype] = np.dtype([("point3D_id", "<u8"), ("xyz", "<f8", 3), ("rgb", "u1", 3),
+                                                   ("error", "<f8"), ("track_length", "<u8")])
+
+# the compiled helpers are typed eagerly, as compiling them on the first call with arrays backed by a memory map
+# leaves reference cycles behind that prevent the map from being closed
+_BYTES: Final[types.Array] = types.Array(types.uint8, 1, "C")
+_READONLY_BYTES: Final[types.Array] = types.Array(types.uint8, 1, "C", readonly=True)
+_INT64S: Final[types.Array] = types.Array(types.int64, 1, "C")
+
+
+@contextmanager
+def _open_mmap(path: Pathable) -> Iterator[mmap.mmap]:
+    """
+    Opens a file as a read-only memory map.
+    Arrays created from the map have to be copied, as the map cannot be closed while it is referenced.
+    :param path: The path of the file to map.
+    :return: The memory map of the whole file.
+    """
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        yield buffer
+
+
+def _read_count(buffer: mmap.mmap, offset: int) -> int:
+    """
+    :param buffer: The memory map to read from.
+    :param offset: The offset of the little-endian 64-bit count.
+    :return: The count at the given offset.
+    """
+    return int.from_bytes(buffer[offset:offset + 8], "little")
+
+
+@njit([types.void(_READONLY_BYTES, _INT64S, _BYTES, _INT64S, _INT64S),
+       types.void(_BYTES, _INT64S, _BYTES, _INT64S, _INT64S)], cache=True)
+def _copy_blocks(src: npt.NDArray, src_offsets: npt.NDArray, dst: npt.NDArray, dst_offsets: npt.NDArray,
+                 sizes: npt.NDArray) -> None:
+    """
+    Copies blocks of bytes between two byte arrays.
+    :param src: The array to copy from.
+    :param src_offsets: The offsets of the blocks in the source array.
+    :param dst: The array to copy to.
+    :param dst_offsets: The offsets of the blocks in the destination array.
+    :param sizes: The sizes of the blocks.
+    """
+    for i in range(len(sizes)):
+        dst[dst_offsets[i]:dst_offsets[i] + sizes[i]] = src[src_offsets[i]:src_offsets[i] + sizes[i]]
+
+
+def _as_points2D(points2D: npt.ArrayLike) -> npt.NDArray:
+    """
+    :param points2D: A structured array with the fields of ``POINT2D_DTYPE``.
+    :return: The points as contiguous array of ``POINT2D_DTYPE``, its bytes match the binary Colmap image format.
+    """
+    points2D = np.asarray(points2D)
+    if points2D.dtype != POINT2D_DTYPE:
+        if points2D.dtype.names is None or set(points2D.dtype.names) != set(POINT2D_DTYPE.names):
+            raise ValueError(f"Expected points2D with the fields {POINT2D_DTYPE.names}, got {points2D.dtype}")
+        # structured arrays are cast by field position, so the fields are matched by name first
+        points2D = recfunctions.require_fields(points2D, POINT2D_DTYPE)
+    return np.ascontiguousarray(points2D, dtype=POINT2D_DTYPE)
+
 
 def write_cameras_binary(cameras: Sequence[Camera], path: Pathable) -> None:
     """
@@ -31,14 +112,12 @@ def write_cameras_binary(cameras: Sequence[Camera], path: Pathable) -> None:
     :param cameras: The sequence of cameras to write.
     :param path: The path of the file to write.
     """
-    with open(path, "wb+") as file:
-        write_bytes(file, len(cameras), "Q")
+    with open(path, "wb+", buffering=_WRITE_BUFFER_SIZE) as file:
+        file.write(_COUNT.pack(len(cameras)))
 
         for camera in cameras:
-            data = (camera.identifier, camera.model.model_id, camera.width, camera.height)
-            write_bytes(file, data, "IiQQ")
-            for param in camera.params:
-                write_bytes(file, param, "d")
+            file.write(_CAMERA_HEADER.pack(camera.identifier, camera.model.model_id, camera.width, camera.height))
+            file.write(np.asarray(camera.params, dtype="<f8").tobytes())
 
 
 def read_cameras_binary(path: Pathable) -> list[Camera]:
@@ -48,16 +127,20 @@ def read_cameras_binary(path: Pathable) -> list[Camera]:
     :return: A sequence of cameras read from the file.
     """
     cameras = []
-    with open(path, "rb") as file:
-        num_cameras = read_bytes(file, "Q")
+    with _open_mmap(path) as buffer:
+        num_cameras = _read_count(buffer, 0)
+        offset = 8
         for _ in range(num_cameras):
-            camera_id, model_id, width, height = read_bytes(file, byte_format="IiQQ")
+            camera_id, model_id, width, height = _CAMERA_HEADER.unpack_from(buffer, offset)
+            offset += _CAMERA_HEADER.size
             model = CAMERA_MODEL_BY_ID[model_id]
-            num_params = model.num_params
-            params = read_bytes(file, byte_format=f"{'d' * num_params}")
-            cameras.append(Camera(identifier=camera_id, model=model, width=width, height=height,
-                                  params=np.array(params)))
-        assert len(cameras) == num_cameras
+            # the few parameters of a camera are kept as tuple instead of allocating an array per camera
+            params_struct = _CAMERA_PARAMS[model.num_params]
+            params = params_struct.unpack_from(buffer, offset)
+            offset += params_struct.size
+            cameras.append(Camera(identifier=camera_id, model=model, width=width, height=height, params=params))
+
+    assert len(cameras) == num_cameras
     return cameras
 
 
@@ -81,21 +164,20 @@ def read_cameras_text(path: Pathable) -> list[Camera]:
     """
     cameras = []
     with open(path, "r") as file:
-        while True:
-            line = file.readline()
-            if not line:
-                break
-            line_strip = line.lstrip()
-            if line_strip.startswith("#") or line_strip == "":
-                continue
-            line = line.strip()
-            splits = line.split(" ")
-            camera_id = int(splits[0])
-            model = CAMERA_MODEL_BY_NAME[splits[1]]
-            width = int(splits[2])
-            height = int(splits[3])
-            params = [float(x) for x in splits[4:]]
-            cameras.append(Camera(identifier=camera_id, model=model, width=width, height=height, params=params))
+        lines = file.read().splitlines()
+
+    for line in lines:
+        line_strip = line.lstrip()
+        if line_strip.startswith("#") or line_strip == "":
+            continue
+        line = line.strip()
+        splits = line.split(" ")
+        camera_id = int(splits[0])
+        model = CAMERA_MODEL_BY_NAME[splits[1]]
+        width = int(splits[2])
+        height = int(splits[3])
+        params = np.array(splits[4:], dtype=np.float64)
+        cameras.append(Camera(identifier=camera_id, model=model, width=width, height=height, params=params))
 
     return cameras
 
@@ -106,21 +188,19 @@ def write_images_binary(images: list[BaseImage], path: Pathable) -> None:
     :param images: The sequence of images to write.
     :param path: The path of the file to write.
     """
-    with open(path, "wb+") as file:
-        write_bytes(file, len(images), "Q")
+    with open(path, "wb+", buffering=_WRITE_BUFFER_SIZE) as file:
+        file.write(_COUNT.pack(len(images)))
 
+        # every image entry is assembled in one buffer and written at once
+        buffer = bytearray()
         for image in images:
-            write_bytes(file, image.identifier, "I")
-            write_bytes(file, image.r_quat, "dddd")
-            write_bytes(file, image.t_vec, "ddd")
-            write_bytes(file, image.camera_id, "I")
-
-            name = image.name + "\0"
-            file.write(name.encode("latin-1"))
-
-            write_bytes(file, len(image.points2D), "Q")
-            for point2D in image.points2D:
-                write_bytes(file, (point2D.x, point2D.y, point2D.point3D_id), "ddQ")
+            buffer += _IMAGE_HEADER.pack(image.identifier, *image.r_quat, *image.t_vec, image.camera_id)
+            buffer += image.name.encode("latin-1")
+            buffer += b"\0"
+            buffer += _COUNT.pack(len(image.points2D))
+            buffer += _as_points2D(image.points2D).data
+            file.write(buffer)
+            buffer.clear()
 
 
 def read_images_binary(path: Pathable) -> list[BaseImage]:
@@ -130,22 +210,24 @@ def read_images_binary(path: Pathable) -> list[BaseImage]:
     :return: A sequence of images read from the file.
     """
     images = []
-    with open(path, "rb") as file:
-        num_images = read_bytes(file, "Q")
+    with _open_mmap(path) as buffer:
+        num_images = _read_count(buffer, 0)
+        offset = 8
         for _ in range(num_images):
-            image_id = read_bytes(file, "I")
-            qvec = read_bytes(file, "dddd")
-            tvec = read_bytes(file, "ddd")
-            camera_id = read_bytes(file, "I")
-            name = read_string(file)
-
-            num_points2D = read_bytes(file, "Q")
-            points2D = []
-            for _ in range(num_points2D):
-                x, y, point3D_id = read_bytes(file, "ddQ")
-                points2D.append(Point2D(x, y, point3D_id))
-
-            image = BaseImage(identifier=image_id, r_quat=qvec, t_vec=tvec, camera_id=camera_id, name=name,
+            header = np.frombuffer(buffer, dtype=_IMAGE_HEADER_DTYPE, count=1, offset=offset).copy()[0]
+            offset += _IMAGE_HEADER_DTYPE.itemsize
+
+            name_end = buffer.find(b"\0", offset)
+            name = buffer[offset:name_end].decode("latin-1")
+            offset = name_end + 1
+
+            num_points2D = _read_count(buffer, offset)
+            offset += 8
+            points2D = np.frombuffer(buffer, dtype=POINT2D_DTYPE, count=num_points2D, offset=offset).copy()
+            offset += POINT2D_DTYPE.itemsize * num_points2D
+
+            image = BaseImage(identifier=int(header["image_id"]), r_quat=tuple(header["qvec"].tolist()),
+                              t_vec=tuple(header["tvec"].tolist()), camera_id=int(header["camera_id"]), name=name,
                               points2D=points2D)
             images.append(image)
 
@@ -172,47 +254,117 @@ def read_images_text(path: Pathable) -> list[BaseImage]:
     """
     images = []
     with open(path, "r") as file:
-        cnt = 0
-        identifier = None
-        qvec = None
-        tvec = None
-        camera_id = None
-        name = None
-        while True:
-            line = file.readline()
-            cnt += 1
-            if not line:
-                break
-            line = line.strip()
-            splits = line.split(" ")
-            if cnt % 2 != 0:
-                image_id = int(splits[0])
-                qvec = Vector4((float(splits[1]), float(splits[2]), float(splits[3]), float(splits[4])))
-                tvec = Vector3((float(splits[5]), float(splits[6]), float(splits[7])))
-                camera_id = int(splits[8])
-                name = splits[9]
-                identifier = image_id
-                qvec = qvec
-                tvec = tvec
-                camera_id = camera_id
-                name = name
-            else:
-                points = []
-                if len(splits) >= 3:
-                    x = None
-                    y = None
-                    for idx, split in enumerate(splits):
-                        if idx % 3 == 0:
-                            points.append(Point2D(x, y, int(split)))
-                        elif idx % 2 == 0:
-                            y = float(split)
-                        else:
-                            x = float(split)
-                images.append(BaseImage(identifier=image_id, r_quat=qvec, t_vec=tvec, camera_id=camera_id, name=name,
-                                        points2D=points))
+        # every image consists of a header line followed by a line with its 2D points
+        lines = [line.strip() for line in file.read().splitlines() if not line.startswith("#")]
+
+    for header, points_line in zip(lines[0::2], lines[1::2]):
+        splits = header.split(" ")
+        image_id = int(splits[0])
+        qvec = Vector4((float(splits[1]), float(splits[2]), float(splits[3]), float(splits[4])))
+        tvec = Vector3((float(splits[5]), float(splits[6]), float(splits[7])))
+        camera_id = int(splits[8])
+        name = splits[9]
+
+        splits = points_line.split()
+        points = create_points2D(splits[0::3], splits[1::3], splits[2::3])
+        images.append(BaseImage(identifier=image_id, r_quat=qvec, t_vec=tvec, camera_id=camera_id, name=name,
+                                points2D=points))
     return images
 
 
+@njit(_INT64S(_READONLY_BYTES, types.int64, types.int64, types.int64), cache=True)
+def _locate_points3D(data: npt.NDArray, num_points3D: int, header_size: int, track_item_size: int) -> npt.NDArray:
+    """
+    Finds the offsets of all point3D entries, which have to be walked sequentially due to their variable length tracks.
+    :param data: The bytes of a file in the binary Colmap point3D format.
+    :param num_points3D: The number of points3D in the file.
+    :param header_size: The size of the fixed part of an entry, ending with the track length.
+    :param track_item_size: The size of one track element.
+    :return: The byte offsets of all entries.
+    """
+    offsets = np.empty(num_points3D, dtype=np.int64)
+    offset = 8
+    for i in range(num_points3D):
+        if offset + header_size > len(data):
+            raise ValueError("Unexpected end of the points3D file")
+        offsets[i] = offset
+        track_length = 0
+        for k in range(8):
+            track_length |= np.int64(data[offset + header_size - 8 + k]) << (8 * k)
+        offset += header_size + track_item_size * track_length
+    if offset > len(data):
+        raise ValueError("Unexpected end of the points3D file")
+    return offsets
+
+
+# noinspection PyPep8Naming
+def write_points3D_array_binary(points3D: Point3DArray, path: Pathable) -> None:
+    """
+    Write an array of points3D to a file in the binary Colmap point3D format.
+    :param points3D: The array of points3D to write.
+    :param path: The path of the file to write.
+    """
+    num_points3D = len(points3D)
+    track_lengths = points3D.track_lengths
+    headers = np.empty(num_points3D, dtype=_POINT3D_HEADER_DTYPE)
+    headers["point3D_id"] = points3D.identifiers
+    headers["xyz"] = points3D.xyz
+    headers["rgb"] = points3D.rgb
+    headers["error"] = points3D.error
+    headers["track_length"] = track_lengths
+    tracks = np.empty(len(points3D.track_image_ids), dtype=TRACK_DTYPE)
+    tracks["image_id"] = points3D.track_image_ids
+    tracks["point2D_idx"] = points3D.track_point2D_idxs
+
+    # interleave the fixed size headers with the tracks
+    header_size = _POINT3D_HEADER_DTYPE.itemsize
+    header_offsets = 8 + header_size * np.arange(num_points3D, dtype=np.int64) + \
+                     TRACK_DTYPE.itemsize * points3D.track_offsets[:-1]
+    data = np.empty(8 + headers.nbytes + tracks.nbytes, dtype=np.uint8)
+    data[:8] = np.frombuffer(_COUNT.pack(num_points3D), dtype=np.uint8)
+    _copy_blocks(headers.view(np.uint8), header_size * np.arange(num_points3D, dtype=np.int64), data, header_offsets,
+                 np.full(num_points3D, header_size, dtype=np.int64))
+    _copy_blocks(tracks.view(np.uint8), TRACK_DTYPE.itemsize * points3D.track_offsets[:-1], data,
+                 header_offsets + header_size, TRACK_DTYPE.itemsize * track_lengths)
+
+    with open(path, "wb+", buffering=_WRITE_BUFFER_SIZE) as file:
+        file.write(data)
+
+
+# noinspection PyPep8Naming
+def read_points3D_array_binary(path: Pathable) -> Point3DArray:
+    """
+    Read an array of points3D from a file in the binary Colmap point3D format.
+    :param path: The path of the file to read.
+    :return: The array of points3D read from the file.
+    """
+    header_size = _POINT3D_HEADER_DTYPE.itemsize
+    with _open_mmap(path) as buffer:
+        num_points3D = _read_count(buffer, 0)
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        try:
+            header_offsets = _locate_points3D(data, num_points3D, header_size, TRACK_DTYPE.itemsize)
+
+            headers = np.empty(num_points3D, dtype=_POINT3D_HEADER_DTYPE)
+            _copy_blocks(data, header_offsets, headers.view(np.uint8),
+                         header_size * np.arange(num_points3D, dtype=np.int64),
+                         np.full(num_points3D, header_size, dtype=np.int64))
+
+            track_lengths = headers["track_length"].astype(np.int64)
+            track_offsets = np.zeros(num_points3D + 1, dtype=np.int64)
+            np.cumsum(track_lengths, out=track_offsets[1:])
+            tracks = np.empty(track_offsets[-1], dtype=TRACK_DTYPE)
+            _copy_blocks(data, header_offsets + header_size, tracks.view(np.uint8),
+                         TRACK_DTYPE.itemsize * track_offsets[:-1], TRACK_DTYPE.itemsize * track_lengths)
+        finally:
+            # the memory map cannot be closed while it is referenced
+            del data
+
+    return Point3DArray(identifiers=headers["point3D_id"].copy(), xyz=headers["xyz"].copy(),
+                        rgb=headers["rgb"].copy(), error=headers["error"].copy(), track_offsets=track_offsets,
+                        track_image_ids=tracks["image_id"].copy(), track_point2D_idxs=tracks["point2D_idx"].copy())
+
+
 # noinspection PyPep8Naming
 def write_points3D_binary(points3D: Sequence[Point3D], path: Pathable) -> None:
     """
@@ -220,19 +372,7 @@ def write_points3D_binary(points3D: Sequence[Point3D], path: Pathable) -> None:
     :param points3D: The sequence of points3D to write.
     :param path: The path of the file to write.
     """
-    with open(path, "wb+") as file:
-        write_bytes(file, len(points3D), "Q")
-
-        for point3D in points3D:
-            write_bytes(file, point3D.identifier, "Q")
-            write_bytes(file, point3D.xyz, "ddd")
-            write_bytes(file, point3D.rgb, "BBB")
-            write_bytes(file, point3D.error, "d")
-
-            write_bytes(file, len(point3D.image_ids), "Q")
-            for image_id, point2D_idx in zip(point3D.image_ids, point3D.point2D_idxs):
-                write_bytes(file, image_id, "I")
-                write_bytes(file, point2D_idx, "I")
+    write_points3D_array_binary(Point3DArray.from_aos(points3D), path)
 
 
 # noinspection PyPep8Naming
@@ -242,26 +382,7 @@ def read_points3D_binary(path: Pathable) -> list[Point3D]:
     :param path: The path of the file to read.
     :return: A sequence of points3D read from the file.
     """
-    points3D = []
-    with open(path, "rb") as file:
-        num_points3D = read_bytes(file, "Q")
-        for _ in range(num_points3D):
-            point3D_id = read_bytes(file, "Q")
-            xyz = read_bytes(file, "ddd")
-            rgb = read_bytes(file, "BBB")
-            error = read_bytes(file, "d")
-
-            image_ids = []
-            point2D_idxs = []
-            num_img_point2D = read_bytes(file, "Q")
-            for _ in range(num_img_point2D):
-                image_ids.append(read_bytes(file, "I"))
-                point2D_idxs.append(read_bytes(file, "I"))
-
-            point3D = Point3D(identifier=point3D_id, xyz=xyz, rgb=rgb, error=error, image_ids=image_ids, point2D_idxs=point2D_idxs)
-            points3D.append(point3D)
-
-    return points3D
+    return read_points3D_array_binary(path).to_aos()
 
 
 # noinspection PyPep8Naming
@@ -287,26 +408,41 @@ def read_points3D_text(path: Pathable) -> list[Point3D]:
     :param path: The path of the file to read.
     :return: A sequence of points3D read from the file.
     """
-    points3D = []
+    head_values = []
+    track_lengths = []
+    track_values = []
     with open(path, "r") as file:
-        while True:
-            line = file.readline()
-            if not line:
-                break
-            line = line.strip()
-            splits = line.split(" ")
-            point3D_id = int(splits[0])
-            xyz = Vector3((float(splits[1]), float(splits[2]), float(splits[3])))
-            rgb = IntVector3((int(splits[4]), int(splits[5]), int(splits[6])))
-            error = float(splits[7])
-
-            image_ids = []
-            point2D_idxs = []
-            for idx, split in enumerate(splits[8:]):
-                if idx % 2 == 0:
-                    point2D_idxs.append(int(split))
-                else:
-                    image_ids.append(int(split))
-            point3D = Point3D(identifier=point3D_id, xyz=xyz, rgb=rgb, error=error, image_ids=image_ids, point2D_idxs=point2D_idxs)
-            points3D.append(point3D)
+        lines = file.read().splitlines()
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("#") or line == "":
+            continue
+        splits = line.split()
+        head_values.extend(splits[:8])
+        track_lengths.append((len(splits) - 8) // 2)
+        track_values.extend(splits[8:])
+
+    # the fixed parts and the tracks of all lines are converted in batches instead of token by token,
+    # each column with its own type, as identifiers above 2**53 are not exactly representable as float64
+    identifiers = np.array(head_values[0::8], dtype=np.uint64).tolist()
+    xyzs = np.array([head_values[1::8], head_values[2::8], head_values[3::8]], dtype=np.float64).T.tolist()
+    rgbs = np.array([head_values[4::8], head_values[5::8], head_values[6::8]], dtype=np.uint8).T.tolist()
+    errors = np.array(head_values[7::8], dtype=np.float64).tolist()
+
+    # tracks are stored as (IMAGE_ID, POINT2D_IDX) pairs
+    track_pairs = np.array(track_values, dtype=np.int64).reshape(-1, 2)
+    tracks = np.empty(len(track_pairs), dtype=TRACK_DTYPE)
+    tracks["image_id"] = track_pairs[:, 0]
+    tracks["point2D_idx"] = track_pairs[:, 1]
+    track_ends = np.cumsum(track_lengths).tolist()
+
+    points3D = []
+    track_start = 0
+    for point3D_id, xyz, rgb, error, track_end in zip(identifiers, xyzs, rgbs, errors, track_ends):
+        track = tracks[track_start:track_end]
+        track_start = track_end
+        point3D = Point3D(identifier=point3D_id, xyz=tuple(xyz), rgb=tuple(rgb), error=error,
+                          image_ids=track["image_id"], point2D_idxs=track["point2D_idx"])
+        points3D.append(point3D)
     return points3D
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
-from typing import Any, Sequence, Union
+from functools import cached_property
+from typing import Any, Final, Sequence, Union
 
 import numpy as np
+from numpy import typing as npt
 
 Numeric = Union[int, float, np.integer, np.floating]
 Vector3 = tuple[Numeric, Numeric, Numeric]
@@ -9,15 +11,65 @@ IntVector3 = tuple[int, int, int]
 Vector4 = tuple[Numeric, Numeric, Numeric, Numeric]
 IntVector4 = tuple[int, int, int, int]
 
+POINT2D_DTYPE: Final[np.dtype] = np.dtype([("x", "<f8"), ("y", "<f8"), ("point3D_id", "<i8")])
+TRACK_DTYPE: Final[np.dtype] = np.dtype([("image_id", "<u4"), ("point2D_idx", "<u4")])
+
 
-@dataclass(frozen=True)
 class Point2D:
     """
     Class representing a 2D coordinate compatible with the Colmap format.
+    Lightweight view on one entry of a structured array of ``POINT2D_DTYPE``.
+    """
+    __slots__ = ("_points", "_idx")
+
+    def __init__(self, points: npt.NDArray, idx: int):
+        """
+        :param points: The structured array of ``POINT2D_DTYPE`` containing the point.
+        :param idx: The index of the point in the array.
+        """
+        self._points = points
+        self._idx = idx
+
+    @property
+    def x(self) -> float:
+        return float(self._points["x"][self._idx])
+
+    @property
+    def y(self) -> float:
+        return float(self._points["y"][self._idx])
+
+    @property
+    def point3D_id(self) -> int:
+        return int(self._points["point3D_id"][self._idx])
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Point2D) and bool(self._points[self._idx] == other._points[other._idx])
+
+    def __repr__(self) -> str:
+        return f"Point2D(x={self.x}, y={self.y}, point3D_id={self.point3D_id})"
+
+
+def create_points2D(x: Sequence[float], y: Sequence[float], point3D_ids: Sequence[int]) -> npt.NDArray:
     """
-    x: float
-    y: float
-    point3D_id: int
+    Creates a structured array of ``POINT2D_DTYPE`` from the given coordinates and 3D point identifiers.
+    :param x: The x-coordinates of the points.
+    :param y: The y-coordinates of the points.
+    :param point3D_ids: The identifiers of the 3D points the points belong to.
+    :return: The created structured array.
+    """
+    points = np.empty(len(point3D_ids), dtype=POINT2D_DTYPE)
+    points["x"] = x
+    points["y"] = y
+    points["point3D_id"] = point3D_ids
+    return points
+
+
+def view_points2D(points: npt.NDArray) -> list[Point2D]:
+    """
+    :param points: A structured array of ``POINT2D_DTYPE``.
+    :return: Views on all points of the array.
+    """
+    return [Point2D(points, idx) for idx in range(len(points))]
 
 
 @dataclass(frozen=True)
@@ -32,11 +84,21 @@ class Point3D:
     image_ids: Sequence[int]
     point2D_idxs: Sequence[int]
 
+    @cached_property
+    def track(self) -> npt.NDArray:
+        """
+        :return: The observations of the point as structured array of ``TRACK_DTYPE``.
+        """
+        track = np.empty(len(self.image_ids), dtype=TRACK_DTYPE)
+        track["image_id"] = self.image_ids
+        track["point2D_idx"] = self.point2D_idxs
+        return track
+
     def __eq__(self, other: Any) -> bool:
         return isinstance(other, Point3D) and \
                self.identifier == other.identifier and \
                self.xyz == other.xyz and \
                self.rgb == other.rgb and \
                self.error == other.error and \
-               all(ia == ib for ia, ib in zip(self.image_ids, other.image_ids)) and \
-               all(pa == pb for pa, pb in zip(self.point2D_idxs, other.point2D_idxs))
+               np.array_equal(self.image_ids, other.image_ids) and \
+               np.array_equal(self.point2D_idxs, other.point2D_idxs)
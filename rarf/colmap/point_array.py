@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+import numpy as np
+from numpy import typing as npt
+
+from rarf.colmap.point import Point3D
+
+
+@dataclass(frozen=True)
+class Point3DArray:
+    """
+    Class representing a sequence of 3D points compatible with the Colmap format as parallel arrays.
+    The variable length tracks are stored in compressed form: the track of the i-th point is located at
+    ``track_offsets[i]:track_offsets[i + 1]`` of ``track_image_ids`` and ``track_point2D_idxs``.
+    """
+    identifiers: npt.NDArray  # (N,) uint64
+    xyz: npt.NDArray  # (N, 3) float64
+    rgb: npt.NDArray  # (N, 3) uint8
+    error: npt.NDArray  # (N,) float64
+    track_offsets: npt.NDArray  # (N + 1,) int64
+    track_image_ids: npt.NDArray  # (M,) uint32
+    track_point2D_idxs: npt.NDArray  # (M,) uint32
+
+    def __len__(self) -> int:
+        return len(self.identifiers)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Point3DArray) and \
+               np.array_equal(self.identifiers, other.identifiers) and \
+               np.array_equal(self.xyz, other.xyz) and \
+               np.array_equal(self.rgb, other.rgb) and \
+               np.array_equal(self.error, other.error) and \
+               np.array_equal(self.track_offsets, other.track_offsets) and \
+               np.array_equal(self.track_image_ids, other.track_image_ids) and \
+               np.array_equal(self.track_point2D_idxs, other.track_point2D_idxs)
+
+    @property
+    def track_lengths(self) -> npt.NDArray:
+        """
+        :return: The number of observations of every point.
+        """
+        return np.diff(self.track_offsets)
+
+    @staticmethod
+    def from_aos(points3D: Sequence[Point3D]) -> "Point3DArray":
+        """
+        Creates the array representation of a sequence of points.
+        :param points3D: The points to convert.
+        :return: The points as parallel arrays.
+        """
+        num_points3D = len(points3D)
+        track_lengths = np.fromiter((len(point3D.image_ids) for point3D in points3D), dtype=np.int64,
+                                    count=num_points3D)
+        track_offsets = np.zeros(num_points3D + 1, dtype=np.int64)
+        np.cumsum(track_lengths, out=track_offsets[1:])
+
+        def concat_tracks(values: list[Sequence[int]]) -> npt.NDArray:
+            return np.concatenate(values).astype(np.uint32) if values else np.empty(0, dtype=np.uint32)
+
+        return Point3DArray(
+            identifiers=np.array([point3D.identifier for point3D in points3D], dtype=np.uint64),
+            xyz=np.array([point3D.xyz for point3D in points3D], dtype=np.float64).reshape(-1, 3),
+            rgb=np.array([point3D.rgb for point3D in points3D], dtype=np.uint8).reshape(-1, 3),
+            error=np.array([point3D.error for point3D in points3D], dtype=np.float64),
+            track_offsets=track_offsets,
+            track_image_ids=concat_tracks([point3D.image_ids for point3D in points3D]),
+            track_point2D_idxs=concat_tracks([point3D.point2D_idxs for point3D in points3D])
+        )
+
+    def to_aos(self) -> list[Point3D]:
+        """
+        :return: The points as a list of individual points. The tracks are views on the track arrays.
+        """
+        track_offsets = self.track_offsets.tolist()
+        return [Point3D(identifier=identifier, xyz=tuple(xyz), rgb=tuple(rgb), error=error,
+                        image_ids=self.track_image_ids[start:end], point2D_idxs=self.track_point2D_idxs[start:end])
+                for identifier, xyz, rgb, error, start, end in zip(self.identifiers.tolist(), self.xyz.tolist(),
+                                                                   self.rgb.tolist(), self.error.tolist(),
+                                                                   track_offsets[:-1], track_offsets[1:])]
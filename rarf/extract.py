@@ -1,5 +1,8 @@
 import json
 import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Sequence, Final
@@ -7,7 +10,8 @@ from typing import Sequence, Final
 import cv2
 import numpy as np
 from dateutil import tz
-from scipy.optimize import minimize
+from numba import njit
+from scipy.optimize import minimize_scalar
 from pyproj import CRS, Transformer
 from scipy.spatial.transform import Rotation
 
@@ -19,7 +23,7 @@ from rarf.srt.srt_parser import SrtParser
 from rarf.video.video_frame_accessor import VideoFrameAccessor
 
 CORD_TRANSFORMER: Final[Transformer] = Transformer.from_crs(CRS.from_epsg(4326), CRS.from_epsg(32633))
-CORD_CONV_MAT: Final[np.ndarray] = np.array([[1, 0, 0], [0, -1, 0], [0, 0, -1]])
+CORD_CONV_MAT: Final[np.ndarray] = np.array([[1, 0, 0], [0, -1, 0], [0, 0, -1]])  # negates the Y and Z axes
 CAMERA_ID: Final[int] = 1
 
 
@@ -67,26 +71,23 @@ def _get_air_data_video_frames(airdata_file: str, video_timestamp: datetime) ->
     # AirData Frames are in UTC
     start = utc.astimezone(tz.tzlocal())  # convert to local time
 
+    start_offset = start - timedelta(milliseconds=ad_frames[0].time)
     for frame in ad_frames:
-        frame.datetime = (
-            start
-            + timedelta(milliseconds=frame.time)
-            - timedelta(milliseconds=ad_frames[0].time)
-        )
+        frame.datetime = start_offset + timedelta(milliseconds=frame.time)
 
     ms_offset = ad_parser.get_video_offset(airdata_file, video_timestamp)
-    is_videos = [
-        frame.isVideo
-        if timedelta(milliseconds=frame.time) >= timedelta(milliseconds=ms_offset)
-        else False
-        for frame in ad_frames
-    ]
-    videos_max_index = len(is_videos) - 1
-    first_idx = is_videos.index(True)
-    try:
-        last_idx = is_videos.index(False, first_idx) - 1
-    except ValueError:
+    num_frames = len(ad_frames)
+    times = np.fromiter((frame.time for frame in ad_frames), dtype=np.float64, count=num_frames)
+    is_videos = np.fromiter((bool(frame.isVideo) for frame in ad_frames), dtype=bool, count=num_frames)
+    is_videos &= times >= ms_offset
+    videos_max_index = num_frames - 1
+    if not is_videos.any():
+        raise ValueError("The AirData file contains no video frames after the video offset")
+    first_idx = int(np.argmax(is_videos))
+    if is_videos[first_idx:].all():
         last_idx = videos_max_index
+    else:
+        last_idx = first_idx + int(np.argmin(is_videos[first_idx:])) - 1
     assert first_idx < last_idx, f"Frames {first_idx} and {last_idx} do not form a valid video"
     assert (
         ad_frames[first_idx].isVideo
@@ -102,59 +103,178 @@ def _get_air_data_video_frames(airdata_file: str, video_timestamp: datetime) ->
     return ad_frames[first_idx: last_idx + 1]
 
 
+@njit(cache=True)
+def _offset_mse(offset: float, srt_seconds: np.ndarray, ad_seconds: np.ndarray, ad_lons: np.ndarray,
+                ad_lats: np.ndarray, srt_lons: np.ndarray, srt_lats: np.ndarray) -> float:
+    # interpolates the AirData positions at the shifted SRT times like np.interp and reduces them in a single pass
+    last = len(ad_seconds) - 1
+    total = 0.0
+    for i in range(len(srt_seconds)):
+        x = srt_seconds[i] + offset
+        if x <= ad_seconds[0]:
+            lon = ad_lons[0]
+            lat = ad_lats[0]
+        elif x >= ad_seconds[last]:
+            lon = ad_lons[last]
+            lat = ad_lats[last]
+        else:
+            j = np.searchsorted(ad_seconds, x, side="right") - 1
+            w = (x - ad_seconds[j]) / (ad_seconds[j + 1] - ad_seconds[j])
+            lon = ad_lons[j] + w * (ad_lons[j + 1] - ad_lons[j])
+            lat = ad_lats[j] + w * (ad_lats[j + 1] - ad_lats[j])
+        d_lon = lon - srt_lons[i]
+        d_lat = lat - srt_lats[i]
+        total += d_lon * d_lon + d_lat * d_lat
+    return total / len(srt_seconds)
+
+
 def _optimize_srt_to_air_data_offset(srt_frames: list[SrtFrame], ad_frames: list[AirDataFrame]) -> float:
     # use minimization to find the best offset
 
     st = ad_frames[0].datetime  # start time
-    srt_seconds = np.array([(srt.timestamp - st).total_seconds() for srt in srt_frames])
-    ad_seconds = np.array([(ad.datetime - st).total_seconds() for ad in ad_frames])
-    ad_lons = np.array([frame.longitude for frame in ad_frames])
-    ad_lats = np.array([frame.latitude for frame in ad_frames])
+    srt_seconds = np.array([(srt.timestamp - st).total_seconds() for srt in srt_frames], dtype=np.float64)
+    ad_seconds = np.array([(ad.datetime - st).total_seconds() for ad in ad_frames], dtype=np.float64)
+    ad_lons = np.array([frame.longitude for frame in ad_frames], dtype=np.float64)
+    ad_lats = np.array([frame.latitude for frame in ad_frames], dtype=np.float64)
+    srt_lons = np.fromiter((frame.longitude for frame in srt_frames), dtype=np.float64, count=len(srt_frames))
+    srt_lats = np.fromiter((frame.latitude for frame in srt_frames), dtype=np.float64, count=len(srt_frames))
 
     def mse(s: float) -> float:
-        inter_lon = np.interp(srt_seconds + s, ad_seconds, ad_lons)
-        inter_lat = np.interp(srt_seconds + s, ad_seconds, ad_lats)
+        return _offset_mse(s, srt_seconds, ad_seconds, ad_lons, ad_lats, srt_lons, srt_lats)
 
-        mse = np.mean(
-            (inter_lon - [frame.longitude for frame in srt_frames]) ** 2
-            + (inter_lat - [frame.latitude for frame in srt_frames]) ** 2
-        )
-        return mse
+    # the offset is one-dimensional, so a bracketing line search needs fewer evaluations than a simplex search
+    res = minimize_scalar(mse, bracket=(-1.0, 1.0), method="brent")
 
-    res = minimize(mse, 0, method="Nelder-Mead", options={"disp": False})
+    return float(res.x)
 
-    return res.x[0]
 
-
-def _extract_frames(video_files: Sequence[str], srt_frames: Sequence[SrtFrame], frame_to_video: list[int],
-                    sampling_rate: int, frame_target: str, img_extension: str) -> tuple[list[str], list[datetime]]:
+def _extract_video_frames(video_idx: int, video_file: str, srt_frames: Sequence[SrtFrame], sampling_rate: int,
+                          frame_target: str, img_extension: str,
+                          num_writers: int = 1) -> list[tuple[str, int, int, datetime]]:
     frame_accessor = VideoFrameAccessor()
-    image_files = []
-    image_timestamps = []
-
-    for v_idx, video_file in enumerate(video_files):
-        cur_srt_frames = np.array(srt_frames)[np.array(frame_to_video) == v_idx]
-
+    extracted = []
+    writes = []
+    # encoding the images releases the GIL, so it overlaps with decoding the next frames;
+    # the number of pending images is bounded to limit the memory usage
+    pending = threading.BoundedSemaphore(2 * num_writers)
+
+    def write_image(path: str, img: np.ndarray) -> None:
+        try:
+            # the images are the result of the extraction and are read again, so they stay in the page cache
+            # (O_DIRECT would evict them); imwrite encodes straight into the file without an intermediate buffer
+            cv2.imwrite(path, img)
+        finally:
+            pending.release()
+
+    with ThreadPoolExecutor(max_workers=num_writers) as writer:
         def accessor_callback(frame_idx: int, img: np.ndarray) -> bool:
-            if len(cur_srt_frames) <= frame_idx:
+            if len(srt_frames) <= frame_idx:
                 return False
 
             cur_srt_frame = srt_frames[frame_idx]
-            srt_frame_id = cur_srt_frame.id
-            timestamp = cur_srt_frame.timestamp
-            filename = f"{len(image_files)}_{frame_idx}_{srt_frame_id}.{img_extension}"
-            cv2.imwrite(os.path.join(frame_target, filename), img)
+            # the final file name depends on the frames extracted from previous videos, so use a temporary one
+            temp_filename = f"_{video_idx}_{frame_idx}.{img_extension}"
+            pending.acquire()
+            writes.append(writer.submit(write_image, os.path.join(frame_target, temp_filename), img))
 
-            image_files.append(filename)
-            image_timestamps.append(timestamp)
+            extracted.append((temp_filename, frame_idx, cur_srt_frame.id, cur_srt_frame.timestamp))
 
             return True
 
         frame_accessor.access(video_file, accessor_callback, sampling_rate=sampling_rate)
 
+    # propagate errors of the image writes
+    for write in writes:
+        write.result()
+
+    return extracted
+
+
+def _remove_temp_images(frame_target: str, img_extension: str) -> None:
+    # temporary images are named "_{video_idx}_{frame_idx}.{img_extension}"
+    pattern = re.compile(rf"_\d+_\d+\.{re.escape(img_extension)}")
+    with os.scandir(frame_target) as entries:
+        for entry in entries:
+            if pattern.fullmatch(entry.name):
+                os.remove(entry.path)
+
+
+def _extract_frames(video_files: Sequence[str], srt_frames: Sequence[SrtFrame], frame_to_video: list[int],
+                    sampling_rate: int, frame_target: str, img_extension: str) -> tuple[list[str], list[datetime]]:
+    image_files = []
+    image_timestamps = []
+
+    # videos are decoded independently, so extract them in parallel
+    max_workers = max(1, min(len(video_files), os.cpu_count() or 1))
+    num_writers = max(1, (os.cpu_count() or 1) // max_workers)
+    # the SRT frames are ordered by video, so the frames of each video form one contiguous slice
+    video_bounds = np.searchsorted(frame_to_video, np.arange(len(video_files) + 1)).tolist()
+    try:
+        if len(video_files) == 1:
+            # a single video is extracted in this process instead of starting a worker process for it
+            extractions = [_extract_video_frames(0, video_files[0], list(srt_frames[video_bounds[0]:video_bounds[1]]),
+                                                 sampling_rate, frame_target, img_extension, num_writers)]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = []
+                for v_idx, video_file in enumerate(video_files):
+                    cur_srt_frames = list(srt_frames[video_bounds[v_idx]:video_bounds[v_idx + 1]])
+                    futures.append(executor.submit(_extract_video_frames, v_idx, video_file, cur_srt_frames,
+                                                   sampling_rate, frame_target, img_extension, num_writers))
+            # all workers have finished, so no temporary image is written after a failure is raised here
+            extractions = [future.result() for future in futures]
+
+        # merge in video order to keep the file names deterministic
+        for extracted in extractions:
+            for temp_filename, frame_idx, srt_frame_id, timestamp in extracted:
+                filename = f"{len(image_files)}_{frame_idx}_{srt_frame_id}.{img_extension}"
+                os.replace(os.path.join(frame_target, temp_filename), os.path.join(frame_target, filename))
+
+                image_files.append(filename)
+                image_timestamps.append(timestamp)
+    except BaseException:
+        # the images of failed and of not yet merged videos are left under their temporary names
+        _remove_temp_images(frame_target, img_extension)
+        raise
+
     return image_files, image_timestamps
 
 
+def _get_colmap_poses(frames: Sequence[AirDataFrame], origin_altitude: float,
+                      origin_transformed: Sequence[float]) -> tuple[list[list[float]], list[list[float]]]:
+    # all frames are transformed at once, as both pyproj and scipy are vectorized over arrays
+    num_frames = len(frames)
+    if num_frames == 0:
+        return [], []
+    lats = np.fromiter((frame.latitude for frame in frames), dtype=np.float64, count=num_frames)
+    lons = np.fromiter((frame.longitude for frame in frames), dtype=np.float64, count=num_frames)
+    altitudes = np.fromiter((frame.altitude or 0 for frame in frames), dtype=np.float64, count=num_frames)
+    xs, ys = CORD_TRANSFORMER.transform(lats, lons)
+
+    col_t_vecs = np.stack([
+        np.asarray(xs) - origin_transformed[0],
+        np.asarray(ys) - origin_transformed[1],
+        altitudes - origin_altitude,
+    ], axis=1)
+    # CORD_CONV_MAT only negates the Y and Z axes, so applying it reduces to flipping signs
+    col_t_vecs[:, 1:] *= -1
+
+    r_vecs = np.stack([
+        # pitch is rotation around X axis (+90° because per default it faces forward)
+        np.fromiter((float(frame.gimbal_pitch) + 90 if frame.gimbal_pitch is not None else 0.0 for frame in frames),
+                    dtype=np.float64, count=num_frames),
+        np.zeros(num_frames),  # roll (Y-axis) is always zero!
+        np.fromiter((frame.compass_heading if frame.compass_heading is not None else 0.0 for frame in frames),
+                    dtype=np.float64, count=num_frames),
+    ], axis=1) % 360
+    col_r_mats = Rotation.from_euler("xyz", r_vecs, degrees=True).as_matrix()
+    col_r_mats[:, 1:, :] *= -1
+    col_r_quats = Rotation.from_matrix(col_r_mats).as_quat(False)
+    col_r_quats = col_r_quats[:, [3, 0, 1, 2]]  # colmap uses W, X, Y, Z order
+
+    return col_r_quats.tolist(), col_t_vecs.tolist()
+
+
 def _write_image_file(path: str, image_data: Sequence[tuple[int, list, list, int, str]]):
     with open(path, "w+") as f:
         for identifier, r_quat, t_vec, camera_id, image_file in image_data:
@@ -199,32 +319,10 @@ def create_colmap_data(video_files: Sequence[str], dem_config_file: str, airdata
     origin, origin_transformed = _get_dem_origin(dem_config_file)
     origin_altitude = origin.altitude or 0
 
-    image_data = []
-    for i, image_file in enumerate(image_files):
-        frame = interpolated_frames[i]
-        frame_altitude = frame.altitude or 0
-        height_diff = frame_altitude - origin_altitude
-
-        frame_coord = CORD_TRANSFORMER.transform(frame.latitude,  frame.longitude)
-        t_vec = [
-            frame_coord[0] - origin_transformed[0],
-            frame_coord[1] - origin_transformed[1],
-            height_diff,
-        ]
-        col_t_vec: list = (CORD_CONV_MAT @ t_vec).tolist()
-
-        r_vec = [
-            float(frame.gimbal_pitch) + 90 if frame.gimbal_pitch is not None else 0.0,
-            # pitch is rotation around X axis (+90° because per default it faces forward)
-            0,  # roll (Y-axis) is always zero!
-            frame.compass_heading if frame.compass_heading is not None else 0.0,
-        ]
-        r_vec = [r % 360 for r in r_vec]
-        r_mat = Rotation.from_euler("xyz", r_vec, degrees=True).as_matrix()
-        col_r_quat = Rotation.from_matrix(CORD_CONV_MAT @ r_mat).as_quat(False)
-        col_r_quat = [col_r_quat[3], col_r_quat[0], col_r_quat[1], col_r_quat[2]]  # colmap uses W, X, Y, Z order
-
-        image_data.append((i, col_r_quat, col_t_vec, CAMERA_ID, image_file))
+    col_r_quats, col_t_vecs = _get_colmap_poses(interpolated_frames[:len(image_files)], origin_altitude,
+                                                 origin_transformed)
+    image_data = [(i, col_r_quat, col_t_vec, CAMERA_ID, image_file)
+                  for i, (image_file, col_r_quat, col_t_vec) in enumerate(zip(image_files, col_r_quats, col_t_vecs))]
 
     _write_image_file(image_file_target, image_data)
 
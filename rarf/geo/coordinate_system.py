@@ -1,21 +1,23 @@
 from dataclasses import dataclass
 from enum import Enum
-from functools import cache
-from typing import Final, Any, Iterator, Callable
+from functools import cached_property
+from typing import Final, Iterator, Callable
 
 import numpy as np
 from numpy import typing as npt
 
 from rarf.geo.direction import Direction
 
-_DIRECTION_TRANSFORM_ROWS: Final[dict[Direction, npt.NDArray]] = {
-    Direction.RIGHT: np.array([1, 0, 0]),
-    Direction.LEFT: np.array([-1, 0, 0]),
-    Direction.UP: np.array([0, 1, 0]),
-    Direction.DOWN: np.array([0, -1, 0]),
-    Direction.FORWARD: np.array([0, 0, 1]),
-    Direction.BACKWARD: np.array([0, 0, -1])
-}
+# rows of the transformation matrix indexed by the direction values
+_DIRECTION_TRANSFORM_ROWS: Final[npt.NDArray] = np.array([
+    [0, 0, 0],  # unused
+    [0, 1, 0],  # Direction.UP
+    [0, -1, 0],  # Direction.DOWN
+    [-1, 0, 0],  # Direction.LEFT
+    [1, 0, 0],  # Direction.RIGHT
+    [0, 0, 1],  # Direction.FORWARD
+    [0, 0, -1],  # Direction.BACKWARD
+], dtype=np.int8)
 
 
 class Handedness(Enum):
@@ -99,11 +101,14 @@ class CoordinateSystem:
         """
         return CoordinateSystem(Direction.FORWARD, Direction.RIGHT, Direction.UP)
 
+    @cached_property
+    def _directions(self) -> tuple[Direction, Direction, Direction]:
+        return self.x_direction, self.y_direction, self.z_direction
+
     def __iter__(self) -> Iterator[Direction]:
-        return iter((self.x_direction, self.y_direction, self.z_direction))
+        return iter(self._directions)
 
-    @property
-    @cache
+    @cached_property
     def handedness(self) -> Handedness:
         """
         :return: The handedness of the coordinate system.
@@ -132,13 +137,23 @@ class CoordinateSystem:
         """
         return self.handedness == Handedness.Right
 
-    @property
-    @cache
-    def mat(self, dtype: Any = None) -> npt.NDArray:
+    @cached_property
+    def mat(self) -> npt.NDArray:
         """
         :return: The transformation matrix representing this coordinate system (row major).
         """
-        return np.array([_DIRECTION_TRANSFORM_ROWS[direction] for direction in self], dtype=dtype)
+        return _DIRECTION_TRANSFORM_ROWS[self._directions, :].astype(np.int64)
+
+    @cached_property
+    def inv_mat(self) -> npt.NDArray:
+        """
+        :return: The inverse of the transformation matrix, equal to its transpose as all rows are signed unit vectors.
+        """
+        if self.handedness == Handedness.Undefined:
+            raise ValueError(f"The transformation matrix of {self} is not invertible as its axes are not distinct.")
+        inv_mat = self.mat.T.astype(np.float64)
+        inv_mat.setflags(write=False)
+        return inv_mat
 
     def convert(self, mat: npt.NDArray, target_system: 'CoordinateSystem') -> npt.NDArray:
         """
@@ -147,11 +162,7 @@ class CoordinateSystem:
         :param target_system: The target coordinate system to convert to.
         :return: The converted matrix.
         """
-        from_mat = self.mat
-        to_mat = target_system.mat
-
-        conv_mat = to_mat @ np.linalg.inv(from_mat) @ mat
-        return conv_mat
+        return target_system.mat @ self.inv_mat @ mat
 
     def convert_func(self, target_system: 'CoordinateSystem') -> Callable[[npt.NDArray], npt.NDArray]:
         """
@@ -159,11 +170,9 @@ class CoordinateSystem:
         :param target_system: The target coordinate system to convert to.
         :return: A function converting matrices from this coordinate system to the target coordinate system.
         """
-        from_mat = self.mat
-        inv_from_mat = np.linalg.inv(from_mat)
-        to_mat = target_system.mat
+        conv_mat = target_system.mat @ self.inv_mat
 
         def inner(mat: npt.NDArray) -> npt.NDArray:
-            return to_mat @ inv_from_mat @ mat
+            return conv_mat @ mat
 
         return inner
@@ -1,7 +1,7 @@
-from enum import Enum
+from enum import IntEnum
 
 
-class Direction(Enum):
+class Direction(IntEnum):
     UP = 0b001
     DOWN = 0b010
     LEFT = 0b011
@@ -1,6 +1,6 @@
 # pylint: skip-file
 import datetime
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 
 class SrtFrame:
@@ -8,6 +8,41 @@ class SrtFrame:
     Domain class representing one frame of a Srt file
     """
 
+    __slots__ = (
+        "id",
+        "start",
+        "end",
+        "FrameCnt",
+        "DiffTime",
+        "timestamp",
+        "iso",
+        "shutter",
+        "fnum",
+        "ev",
+        "focal_len",
+        "dzoom",
+        "latitude",
+        "longitude",
+        "rel_alt",
+        "abs_alt",
+        "drone_speedx",
+        "drone_speedy",
+        "drone_speedz",
+        "drone_yaw",
+        "drone_pitch",
+        "drone_roll",
+        "gb_yaw",
+        "gb_pitch",
+        "gb_roll",
+        "ae_meter_md",
+        "dzoom_ratio",
+        "delta",
+        "color_md",
+        "ct",
+        # meta information of Srt files not declared above
+        "__dict__",
+    )
+
     def __init__(self) -> None:
         self.id: Optional[int] = None
         self.start: Optional[datetime.time] = None
@@ -39,3 +74,24 @@ class SrtFrame:
         self.delta: Optional[int] = None
         self.color_md: Optional[str] = None
         self.ct: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: all properties of the frame by name (declared ones first)
+        """
+        properties = {key: getattr(self, key) for key in FIELDS}
+        properties.update(self.__dict__)
+        return properties
+
+    def update(self, properties: Dict[str, Any]) -> None:
+        """
+        Sets the given properties of the frame
+        :param properties: values by property name
+        """
+        for key, value in properties.items():
+            setattr(self, key, value)
+
+
+FIELDS: Tuple[str, ...] = tuple(
+    slot for slot in SrtFrame.__slots__ if slot != "__dict__"
+)
@@ -14,7 +14,96 @@ from typing import (
     Union,
 )
 
-from rarf.srt.srt_frame import SrtFrame
+import numpy as np
+import numpy.typing as npt
+
+from rarf.srt.srt_frame import FIELDS, SrtFrame
+
+_BRACKET_PATTERN = re.compile(r"\[[^\]]*\]")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_BRACKET_TRANSLATION = str.maketrans("", "", "[]")
+_READ_BUFFER_SIZE = 1 << 20
+_TIME_FIELDS = frozenset({"start", "end"})
+
+
+def _parse_time(value: str) -> datetime.time:
+    """
+    Parses a subtitle time ("%H:%M:%S,%f")
+    Zero-padded values with milliseconds are sliced directly, as strptime is comparatively slow
+    :param value: time string
+    :return: the parsed time
+    """
+    if len(value) == 12 and value[2] == ":" and value[5] == ":" and value[8] == ",":
+        return datetime.time(
+            int(value[0:2]),
+            int(value[3:5]),
+            int(value[6:8]),
+            int(value[9:12]) * 1000,
+        )
+    return datetime.datetime.strptime(value, "%H:%M:%S,%f").time()
+
+
+def _to_column(key: str, values: List[Any]) -> npt.NDArray[Any]:
+    """
+    Converts the values of one frame property to a column
+    :param key: name of the frame property
+    :param values: values of all frames
+    :return: datetime64/timedelta64 column for the timestamp/times, int64 or float64 column (NaN if missing) for numeric
+    values and an object column otherwise
+    """
+    if key == "timestamp":
+        return np.array(values, dtype="datetime64[us]")
+    if key in _TIME_FIELDS:
+        return np.array(
+            [
+                None
+                if value is None
+                else datetime.timedelta(
+                    hours=value.hour,
+                    minutes=value.minute,
+                    seconds=value.second,
+                    microseconds=value.microsecond,
+                )
+                for value in values
+            ],
+            dtype="timedelta64[us]",
+        )
+    if all(type(value) is int for value in values):
+        return np.array(values, dtype=np.int64)
+    if all(value is None or type(value) in (int, float) for value in values):
+        return np.array(values, dtype=np.float64)
+    return np.array(values, dtype=object)
+
+
+def _parse_timestamp(value: str) -> datetime.datetime:
+    """
+    Parses a frame timestamp ("%Y-%m-%d %H:%M:%S,%f" or "%Y-%m-%d %H:%M:%S.%f")
+    Zero-padded values with milliseconds are sliced directly, as strptime is comparatively slow
+    :param value: timestamp string
+    :return: the parsed timestamp
+    """
+    if (
+        len(value) == 23
+        and value[4] == "-"
+        and value[7] == "-"
+        and value[10] == " "
+        and value[13] == ":"
+        and value[16] == ":"
+        and (value[19] == "," or value[19] == ".")
+    ):
+        return datetime.datetime(
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+            int(value[20:23]) * 1000,
+        )
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S,%f")
+    except ValueError:
+        return datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S.%f")
 
 
 class SrtParser:
@@ -44,6 +133,25 @@ class SrtParser:
 
         return res
 
+    def parse_columnar(
+        self,
+        file: Union[str, TextIO, TextIOBase],
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> Dict[str, npt.NDArray[Any]]:
+        """
+        Method used to parse an SRT file into one column per declared frame property, without keeping the frames
+        :param file: path or file pointer of the SRT file
+        :param skip: Skip the first n frames
+        :param limit: Break reading frames after m frames
+        :return: columns by property name
+        """
+        columns: Dict[str, List[Any]] = {key: [] for key in FIELDS}
+        for frame in self.parse_yield(file, skip, limit):
+            for key, values in columns.items():
+                values.append(getattr(frame, key))
+        return {key: _to_column(key, values) for key, values in columns.items()}
+
     def parse_with_callback(
         self,
         file: Union[str, TextIO, TextIOBase],
@@ -68,108 +176,80 @@ class SrtParser:
         :return:
         """
         # get a file_pointer if necessary
-        t = type(file)
-        if t == str:
-            file_pointer = open(file, encoding="UTF8")
-        elif t == TextIO or issubclass(t, TextIOBase):
+        is_path = isinstance(file, str)
+        if is_path:
+            file_pointer = open(file, encoding="UTF8", buffering=_READ_BUFFER_SIZE)
+        elif isinstance(file, TextIOBase):
             file_pointer = file
         else:
             raise Exception(
                 f"File must be either a string or a file pointer not from Type: {type(file)}"
             )
 
-        # state of current iteration
-        current_frame = None
-        found_id = False
-        found_timestamp = False
-        found_meta_start = False
-        found_meta_timestamp = False
-        additional_meta_information = ""
+        # blank lines only separate the frames, so all remaining lines are walked positionally
+        lines = [
+            line for line in map(str.strip, file_pointer.read().splitlines()) if line
+        ]
+        num_lines = len(lines)
+        idx = 0
         num_of_frames = 0
         accepted_frames = 0
 
-        while True:
-            if accepted_frames == limit:
-                break
-
-            # Get next line from file
-            line = file_pointer.readline()
-
-            # if line is empty end of file is reached
-            if not line:
-                break
+        while idx < num_lines and accepted_frames != limit:
+            # every frame starts with its id and the subtitle time range
+            num_of_frames += 1
+            is_accepted = num_of_frames > skip
+            current_frame = SrtFrame()
+            current_frame.id = int(lines[idx]) - 1
+            if is_accepted and idx + 1 < num_lines:
+                start, _, end = lines[idx + 1].partition("-->")
+                current_frame.start = _parse_time(start.strip())
+                current_frame.end = _parse_time(end.strip())
+            idx += 2
 
-            # remove whitespaces
-            line = line.strip()
+            # followed by the meta information, which ends with the closing font tag
+            meta_start = None
+            meta_timestamp = None
+            additional_meta_information = []
+            is_complete = False
+            while idx < num_lines:
+                line = lines[idx]
+                idx += 1
+                if meta_start is None and "<font size=" in line:
+                    meta_start = line
+                elif meta_timestamp is None:
+                    meta_timestamp = line
+                else:
+                    additional_meta_information.append(line)
+                    if "</font>" in line:
+                        is_complete = True
+                        break
 
-            if len(line) == 0:
+            if not is_complete or not is_accepted:
                 continue
 
-            if not found_id:
-                num_of_frames += 1
-                current_frame = SrtFrame()
-                current_frame.id = int(line) - 1
-                found_id = True
-            elif not found_timestamp:
-                splits = line.split("-->")
-                current_frame.start = datetime.datetime.strptime(
-                    splits[0].strip(), "%H:%M:%S,%f"
-                ).time()
-                current_frame.end = datetime.datetime.strptime(
-                    splits[1].strip(), "%H:%M:%S,%f"
-                ).time()
-                found_timestamp = True
-            elif not found_meta_start and "<font size=" in line:
-                idx = line.index(">")
-                line = line[idx:]
-                infostart = line.index("FrameCnt")
-                line = line[infostart:]
-                splits = line.split(",")
-                for split in splits:
+            if meta_start is not None:
+                line = meta_start[meta_start.index("FrameCnt", meta_start.index(">")) :]
+                for split in line.split(","):
                     (key, value) = split.split(":")
-                    current_frame.__dict__[key.strip()] = self.__parse_value(value)
-                found_meta_start = True
-            elif not found_meta_timestamp:
-                # frame line contains timestamp removing , in millis
-                line = line[:23]
-                try:
-                    current_frame.timestamp = datetime.datetime.strptime(
-                        line, "%Y-%m-%d %H:%M:%S,%f"
-                    )
-                except ValueError:
-                    current_frame.timestamp = datetime.datetime.strptime(
-                        line, "%Y-%m-%d %H:%M:%S.%f"
-                    )
-                found_meta_timestamp = True
-            else:
-                additional_meta_information += line.replace("\n", " ")
-
-                if "</font>" in line:
-                    current_meta = dict()
-                    additional_meta_information = additional_meta_information.replace(
-                        "</font>", ""
-                    )
-                    # M30 fix, replace bracket with comma
-                    additional_meta_information = additional_meta_information.replace(
-                        "],", "]"
-                    )
-                    self._parse_meta_information(
-                        additional_meta_information, current_meta
-                    )
-
-                    for k, v in current_meta.items():
-                        current_frame.__dict__[k] = v
-
-                    found_id = False
-                    found_timestamp = False
-                    found_meta_start = False
-                    found_meta_timestamp = False
-                    additional_meta_information = ""
-                    if current_frame is not None and num_of_frames > skip:
-                        yield current_frame
-                        accepted_frames += 1
-
-        if isinstance(file, str):
+                    setattr(current_frame, key.strip(), self.__parse_value(value))
+            # frame line contains timestamp removing , in millis
+            current_frame.timestamp = _parse_timestamp(meta_timestamp[:23])
+
+            current_meta = dict()
+            # M30 fix, replace bracket with comma
+            self._parse_meta_information(
+                "".join(additional_meta_information)
+                .replace("</font>", "")
+                .replace("],", "]"),
+                current_meta,
+            )
+            current_frame.update(current_meta)
+
+            yield current_frame
+            accepted_frames += 1
+
+        if is_path:
             file_pointer.close()
 
     def _parse_meta_information(
@@ -182,50 +262,47 @@ class SrtParser:
         :return: dictionary of the meta information
         """
 
-        meta_information: List[str] = re.findall(
-            r"\[[^\]]*\]", additional_meta_information
+        meta_information: List[str] = _BRACKET_PATTERN.findall(
+            additional_meta_information
         )
         for mi in meta_information:
             # remove brackets
-            mi = mi.replace("[", "").replace("]", "")
+            mi = mi.translate(_BRACKET_TRANSLATION)
             # replace multiple whitespaces by one
-            mi = re.sub(r"\s+", " ", mi)
-            splits = mi.split(":")
-            if len(splits) == 2:
-                # if split has two elements its just a key/value pair
-                key = splits[0].strip().lower()
+            mi = _WHITESPACE_PATTERN.sub(" ", mi)
+            key, sep, value = mi.partition(":")
+            if not sep:
+                continue
+            if ":" not in value:
+                # if there is a single colon its just a key/value pair
+                key = key.strip().lower()
                 if key == "longtitude":  # srt of DJI M2EA has a typo
                     key = "longitude"
-                current_meta_information[key] = self.__parse_value(splits[1])
-            elif len(splits) > 2:
-                # if split has more than two elements it either contains multiple key/value pairs or a sublist
+                current_meta_information[key] = self.__parse_value(value)
+            else:
+                # if there are multiple colons it either contains multiple key/value pairs or a sublist
                 if "," in mi:
                     # colon identifies a sublist element
                     mid_splits = mi.split(",")
                     base = None
 
-                    if len(mid_splits) > 0 and mid_splits[0].count(":") > 1:
-                        val = mid_splits[0]
-                        first_colon = mid_splits[0].index(":")
-                        del mid_splits[0]
-                        base = val[:first_colon]
-                        key_val = val[first_colon + 1 :].lower()
-                        mid_splits = [key_val] + mid_splits
+                    if mid_splits[0].count(":") > 1:
+                        base, _, key_val = mid_splits[0].partition(":")
+                        mid_splits[0] = key_val
 
                     for split in mid_splits:
                         # extract sub elements
-                        inner_split = split.split(":")
-                        if base is None:
-                            key = inner_split[0].strip()
-                        else:
-                            key = f"{base}_{inner_split[0].strip()}"
-                        key = key.lower()
+                        key, _, value = split.partition(":")
+                        key = key.strip()
+                        if base is not None:
+                            key = f"{base}_{key}"
                         current_meta_information[key.lower()] = self.__parse_value(
-                            inner_split[1]
+                            value.partition(":")[0]
                         )
                 else:
                     # no colon identifies multiple key/value pairs separated by a whitespace
-                    for x, y in self.pairwise(mi.replace(": ", " ").split(" ")):
+                    parts = mi.replace(": ", " ").split(" ")
+                    for x, y in zip(parts[0::2], parts[1::2]):
                         current_meta_information[x.lower()] = self.__parse_value(y)
 
     def __parse_value(self, value: str) -> Any:
@@ -238,11 +315,13 @@ class SrtParser:
             return None
 
         value = value.strip()
-        if value.replace(".", "").replace("-", "").replace("+", "").isdigit():
-            if "." in value:
-                return float(value)
-            else:
-                return int(value)
+        # units like "33ms" are sorted out cheaply, the C parsers of int and float reject everything else
+        # (matching a numeric pattern first is slower, as most of the values are numeric)
+        if value[-1:].isdigit():
+            try:
+                return float(value) if "." in value else int(value)
+            except ValueError:
+                pass
         return value
 
     @staticmethod
@@ -1,4 +1,6 @@
+import os
 import struct
+from functools import lru_cache
 from typing import Union, Literal, Iterable, Any, BinaryIO
 
 ByteData = Union[bytes, int, float]
@@ -6,6 +8,18 @@ ByteEndian = Literal["@", "=", "<", ">", "!"]
 ByteFormat = Literal["x", "c", "b", "B", "?", "h", "H", "i", "I", "l", "L", "q", "Q", "n", "N", "e", "f", "d", "s",
                      "p", "P"]
 
+_STRING_CHUNK_SIZE = 4096
+
+
+@lru_cache(maxsize=256)
+def _struct(byte_format: str, byte_endian: str) -> struct.Struct:
+    """
+    :param byte_format: The byte format.
+    :param byte_endian: The byte endianness.
+    :return: The compiled struct for the given format, cached as parsing the format is costly.
+    """
+    return struct.Struct(f"{byte_endian}{byte_format}")
+
 
 def write_bytes(file: BinaryIO, data: Union[ByteData, Iterable[ByteData]], byte_format: Union[ByteFormat, str],
                 byte_endian: ByteEndian = "<") -> None:
@@ -16,10 +30,9 @@ def write_bytes(file: BinaryIO, data: Union[ByteData, Iterable[ByteData]], byte_
     :param byte_format: The byte format to use for writing.
     :param byte_endian: The byte endianness to use for writing.
     """
-    format_str = f"{byte_endian}{byte_format}"
     if len(byte_format) == 1:
         data = (data,)
-    file.write(struct.pack(format_str, *data))
+    file.write(_struct(byte_format, byte_endian).pack(*data))
 
 
 def read_bytes(file: BinaryIO, byte_format: Union[ByteFormat, str],
@@ -31,23 +44,30 @@ def read_bytes(file: BinaryIO, byte_format: Union[ByteFormat, str],
     :param byte_endian: The byte endianness to use for reading.
     :return: The data read from the file.
     """
-    format_str = f"{byte_endian}{byte_format}"
-    num_bytes = struct.calcsize(byte_format)
-    buffer = file.read(num_bytes)
-    data = struct.unpack(format_str, buffer)
+    compiled = _struct(byte_format, byte_endian)
+    buffer = file.read(compiled.size)
+    data = compiled.unpack(buffer)
     return data[0] if len(byte_format) == 1 else data
 
 
-def read_string(file: BinaryIO, terminator: bytes = "\0") -> str:
+def read_string(file: BinaryIO, terminator: str = "\0") -> str:
     """
     Reads text from file until the given terminator is encountered or the end of the file is reached.
+    The file is read in chunks, so it has to be seekable to position it right behind the terminator.
     :param file: The IO to read from.
     :param terminator: The terminator character.
     :return: The text read from the file.
     """
-    characters = []
-    char = ""
-    while char != terminator:
-        characters.append(char)
-        char = file.read(1).decode("latin-1")
-    return "".join(characters)
+    encoded_terminator = terminator.encode("latin-1")
+    chunks = []
+    while True:
+        chunk = file.read(_STRING_CHUNK_SIZE)
+        if not chunk:
+            break
+        idx = chunk.find(encoded_terminator)
+        if idx >= 0:
+            chunks.append(chunk[:idx])
+            file.seek(idx + len(encoded_terminator) - len(chunk), os.SEEK_CUR)
+            break
+        chunks.append(chunk)
+    return b"".join(chunks).decode("latin-1")
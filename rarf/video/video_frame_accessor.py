@@ -1,5 +1,7 @@
 # pylint: disable=R0201
 import os.path
+import queue
+import threading
 from typing import Any, Callable, Generator, List, Optional, Tuple
 
 import cv2
@@ -7,6 +9,14 @@ import numpy.typing as npt
 
 from rarf.video.video_domain import VideoInput
 
+# 8 bit planar pixel formats, for which the decoder returns the luma plane if the BGR conversion is turned off
+_LUMA_PIXEL_FORMATS = ("I420", "YV12")
+# number of frames the decoder thread may run ahead of the consumer
+_PREFETCH_SIZE = 8
+_END_OF_VIDEO = object()
+# number of reused grayscale buffers, the yielded and the previous frame stay valid while the decoder runs ahead
+_NUM_REUSED_BUFFERS = _PREFETCH_SIZE + 3
+
 
 class VideoFrameAccessor:
     """
@@ -23,6 +33,8 @@ class VideoFrameAccessor:
             Callable[[npt.NDArray[Any], npt.NDArray[Any]], bool]
         ] = None,
         read_grayscale: bool = False,
+        read_luma: bool = False,
+        reuse_buffers: bool = False,
     ) -> Generator[Tuple[int, npt.NDArray[Any]], None, None]:
         """
         Method that allows to access video frames, yielding the individual frames
@@ -32,42 +44,150 @@ class VideoFrameAccessor:
         :param limit: Number of frames that should be accessed
         :param check_duplicate_function: Method allowing to check if two frames are duplicated (still frames). Duplicated frames are ignored if parameter is not None
         :param read_grayscale: Flag if video should be read grayscale or bgr
+        :param read_luma: Flag if the luma plane of the decoder should be used as grayscale frame, which skips the BGR conversion and the grayscale conversion. The values are in the video range (usually 16-235) and differ from the grayscale conversion of the BGR frame. Falls back to the grayscale conversion if the pixel format of the video is not supported. OpenCV logs a warning about the raw pixel format for every decoded frame
+        :param reuse_buffers: Flag if the grayscale frames should be converted into a fixed set of reused buffers instead of newly allocated arrays. A yielded frame is only valid until the next but one frame is requested, so it has to be copied if it is kept longer
         :return: Generator of the frames
         """
-        capture = None
         if not os.path.isfile(video_path):
             raise ValueError(f"There is no file on the given path: {video_path}")
 
+        capture = cv2.VideoCapture(video_path)
+        is_luma = read_luma and self._use_luma_plane(capture)
+
+        def needs_image(frame_count: int) -> bool:
+            # frames are only decoded (retrieved) if they are yielded or needed for the duplicate check,
+            # without duplicate check the yielded frames are known in advance
+            return check_duplicate_function is not None or (
+                frame_count >= skip
+                and (sampling_rate <= 0 or (frame_count - skip) % sampling_rate == 0)
+            )
+
+        # the decoder runs ahead in a separate thread, as OpenCV releases the GIL while decoding
+        frame_queue: queue.Queue = queue.Queue(maxsize=_PREFETCH_SIZE)
+        stop = threading.Event()
+        decoder = threading.Thread(
+            target=self._decode,
+            args=(
+                capture,
+                frame_queue,
+                stop,
+                needs_image,
+                (read_grayscale or read_luma) and not is_luma,
+                reuse_buffers,
+                max(limit, 1)
+                if limit is not None and check_duplicate_function is None
+                else None,
+            ),
+        )
+        decoder.start()
+
         previous = None
         try:
-            capture = cv2.VideoCapture(video_path)
-            success, image = capture.read()
-            if success and read_grayscale:
-                image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             count = 0
             frames_after_skip = 0
             used_frames = 0
-            while success:
+            while True:
+                image = frame_queue.get()
+                if image is _END_OF_VIDEO:
+                    break
+                if isinstance(image, BaseException):
+                    raise image
+                is_sampled = sampling_rate <= 0 or frames_after_skip % sampling_rate == 0
                 if (
                     check_duplicate_function is None
                     or previous is None
                     or not check_duplicate_function(image, previous)
                 ):
                     if count >= skip:
-                        if sampling_rate <= 0 or frames_after_skip % sampling_rate == 0:
+                        if is_sampled:
                             yield (count, image)
                             used_frames += 1
                         frames_after_skip += 1
                 previous = image
-                success, image = capture.read()
-                if success and read_grayscale:
-                    image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
                 count += 1
                 if limit is not None and used_frames >= limit:
                     break
         finally:
-            if capture is not None:
-                capture.release()
+            stop.set()
+            decoder.join()
+            capture.release()
+
+    @staticmethod
+    def _decode(
+        capture: cv2.VideoCapture,
+        frame_queue: queue.Queue,
+        stop: threading.Event,
+        needs_image: Callable[[int], bool],
+        convert_grayscale: bool,
+        reuse_buffers: bool,
+        max_images: Optional[int],
+    ) -> None:
+        """
+        Decodes the frames of a video into a bounded queue until the end of the video or until it is stopped
+        :param capture: opened video capture
+        :param frame_queue: queue receiving the image (None if not retrieved) of every frame, followed by the end marker or the raised exception
+        :param stop: event signalling that no more frames are consumed
+        :param needs_image: function returning if the image of a frame count has to be retrieved
+        :param convert_grayscale: Flag if the images should be converted to grayscale
+        :param reuse_buffers: Flag if the grayscale images should be converted into reused buffers
+        :param max_images: Number of retrieved images after which decoding can stop (None if unknown)
+        :return: None
+        """
+
+        def put(item: Any) -> bool:
+            # the decoder also stops if the interpreter shuts down while the generator is still open
+            while not stop.is_set() and threading.main_thread().is_alive():
+                try:
+                    frame_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        gray_buffers: List[Optional[npt.NDArray[Any]]] = (
+            [None] * _NUM_REUSED_BUFFERS if reuse_buffers else []
+        )
+        try:
+            count = 0
+            num_images = 0
+            while max_images is None or num_images < max_images:
+                if not capture.grab():
+                    break
+                image = None
+                if needs_image(count):
+                    success, image = capture.retrieve()
+                    if not success:
+                        break
+                    if convert_grayscale and gray_buffers:
+                        # the buffers are allocated by the first conversions
+                        buffer_idx = num_images % _NUM_REUSED_BUFFERS
+                        image = cv2.cvtColor(
+                            image, cv2.COLOR_BGR2GRAY, dst=gray_buffers[buffer_idx]
+                        )
+                        gray_buffers[buffer_idx] = image
+                    elif convert_grayscale:
+                        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                    num_images += 1
+                if not put(image):
+                    return
+                count += 1
+        except Exception as e:  # pylint: disable=W0703
+            put(e)
+            return
+        put(_END_OF_VIDEO)
+
+    @staticmethod
+    def _use_luma_plane(capture: cv2.VideoCapture) -> bool:
+        """
+        Turns off the BGR conversion of the decoder if the pixel format of the video allows to use the luma plane
+        :param capture: opened video capture
+        :return: True if the decoder returns the luma plane
+        """
+        pixel_format = int(capture.get(cv2.CAP_PROP_CODEC_PIXEL_FORMAT))
+        fourcc = pixel_format.to_bytes(4, "little").decode("latin-1")
+        if fourcc not in _LUMA_PIXEL_FORMATS:
+            return False
+        return capture.set(cv2.CAP_PROP_CONVERT_RGB, 0)
 
     def access(
         self,
@@ -80,6 +200,8 @@ class VideoFrameAccessor:
             Callable[[npt.NDArray[Any], npt.NDArray[Any]], bool]
         ] = None,
         read_grayscale: bool = False,
+        read_luma: bool = False,
+        reuse_buffers: bool = False,
     ) -> None:
         """
         Method that allows to access video frames, calling a given callback function for every frame
@@ -90,6 +212,8 @@ class VideoFrameAccessor:
         :param limit: Number of frames that should be accessed
         :param check_duplicate_function: Method allowing to check if two frames are duplicated (still frames). Duplicated frames are ignored if parameter is not None
         :param read_grayscale: Flag if video should be read grayscale or bgr
+        :param read_luma: Flag if the luma plane of the decoder should be used as grayscale frame (see access_yield)
+        :param reuse_buffers: Flag if the grayscale frames should be converted into reused buffers (see access_yield)
         :return: None
         """
         for (idx, frame) in self.access_yield(
@@ -99,6 +223,8 @@ class VideoFrameAccessor:
             limit,
             check_duplicate_function,
             read_grayscale,
+            read_luma,
+            reuse_buffers,
         ):
             if not callback(idx, frame):
                 break
@@ -109,6 +235,7 @@ class VideoFrameAccessor:
         callback: Callable[[int, npt.NDArray[Any]], bool],
         frame_idx: int,
         read_grayscale: bool = False,
+        try_seek: bool = True,
     ) -> None:
         """
         Method for accessing a single frame per idx of the video
@@ -116,8 +243,28 @@ class VideoFrameAccessor:
         :param callback: callback that is executed for every individual frame
         :param frame_idx: Frame that should be accessed (idx starting with 0)
         :param read_grayscale: Flag if video should be read grayscale or bgr
+        :param try_seek: Flag if the decoder should seek to the frame instead of reading all previous frames (falls back to reading if the container does not support accurate seeking)
         :return: None
         """
+        if try_seek:
+            if not os.path.isfile(video_path):
+                raise ValueError(f"There is no file on the given path: {video_path}")
+
+            capture = cv2.VideoCapture(video_path)
+            try:
+                if (
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                    and int(capture.get(cv2.CAP_PROP_POS_FRAMES)) == frame_idx
+                ):
+                    success, image = capture.read()
+                    if success:
+                        if read_grayscale:
+                            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                        callback(frame_idx, image)
+                    return
+            finally:
+                capture.release()
+
         self.access(
             video_path, callback, frame_idx, 0, 1, read_grayscale=read_grayscale
         )
@@ -158,6 +305,7 @@ class MultiVideoFrameAccessor:
     ) -> Generator[Tuple[int, List[int], List[npt.NDArray[Any]]], None, None]:
         """
         Method for accessing multiple videos in parallel
+        Every video is decoded ahead by the decoder thread of its own generator, so the videos are decoded concurrently
         :param videos: videos to be accessed
         :param check_duplicate_function: Method allowing to check if two frame pairs are duplicated (still frames). Duplicated frames are ignored if parameter is not None
         :return: Generator accessing the frames
@@ -178,7 +326,7 @@ class MultiVideoFrameAccessor:
                 (idx, image) = res
                 indices.append(idx)
                 images.append(image)
-                success = success or True
+                success = True
             if not success:
                 break
             if (
@@ -1,18 +1,61 @@
 import os
 import pathlib
+import queue
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import uuid
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import IntEnum
-from pathlib import Path
-from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
-
+from functools import lru_cache
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
 import numpy.typing as npt
 from cv2 import cv2
 
+# FFMPEG pixel formats of raw frames by dtype and number of channels (OpenCV channel order)
+_RAW_PIXEL_FORMATS: Dict[Tuple[str, int], str] = {
+    ("uint8", 1): "gray",
+    ("uint8", 3): "bgr24",
+    ("uint8", 4): "bgra",
+    ("uint16", 1): "gray16le",
+    ("uint16", 3): "bgr48le",
+    ("uint16", 4): "bgra64le",
+}
+# OpenCV conversions of 8-bit frames by number of channels to the planar YUV 4:2:0 input of FFMPEG
+_YUV420P_CONVERSIONS: Dict[int, int] = {
+    3: cv2.COLOR_BGR2YUV_I420,
+    4: cv2.COLOR_BGRA2YUV_I420,
+}
+# number of frames that may wait for being written to FFMPEG
+_FRAME_QUEUE_SIZE = 8
+# number of threads encoding PNG images in parallel (the encoder releases the GIL)
+_PNG_ENCODE_WORKERS = min(8, os.cpu_count() or 1)
+
+# trade-off between encoding speed and file size of the default H.264 encoding
+Quality = Literal["realtime", "balanced", "archival"]
+_QUALITY_PARAMETERS: Dict[str, Dict[str, str]] = {
+    "realtime": {"-preset": "veryfast", "-tune": "zerolatency"},
+    "balanced": {"-preset": "medium"},
+    "archival": {"-preset": "slow"},
+}
+
 
 def get_mp4v() -> Tuple[str, str, str, str]:
     """
@@ -35,6 +78,152 @@ def get_mpeg1() -> Tuple[str, str, str, str]:
     return "P", "I", "M", "1"
 
 
+def get_raw_input(frame: npt.NDArray[Any]) -> Tuple[str, str]:
+    """
+    Method for describing frames as raw video input of FFMPEG
+    :param frame: first frame of the video
+    :return: FFMPEG pixel format and video size (widthxheight) of the frames
+    """
+    height, width = frame.shape[:2]
+    channels = frame.shape[2] if frame.ndim > 2 else 1
+    pixel_format = _RAW_PIXEL_FORMATS.get((frame.dtype.name, channels))
+    if pixel_format is None:
+        raise ValueError(
+            f"Frames of type {frame.dtype} with {channels} channels can not be written"
+        )
+    return pixel_format, f"{width}x{height}"
+
+
+def _check_frame(
+    idx: int, frame: npt.NDArray[Any], shape: Tuple[int, ...], dtype: np.dtype
+) -> None:
+    """
+    Method for checking that a frame matches the first frame of the video, as the
+    frame size and pixel format are defined once per video
+    :param idx: index of the frame
+    :param frame: to be checked
+    :param shape: shape of the first frame
+    :param dtype: type of the first frame
+    :return: None
+    """
+    if frame.shape != shape or frame.dtype != dtype:
+        raise Exception(
+            f"Frame {idx} of shape {frame.shape} and type {frame.dtype} does not match "
+            f"the first frame of shape {shape} and type {dtype}"
+        )
+
+
+def get_h264_parameters(
+    target_fps: float, quality: Quality = "realtime"
+) -> Dict[str, str]:
+    """
+    Method for defining the FFMPEG parameters of the default H.264 encoding
+    :param target_fps: frames per seconds used to create the video
+    :param quality: "realtime" encodes fastest (with a keyframe every two seconds),
+    "balanced" uses the FFMPEG defaults and "archival" produces the smallest files
+    :return: FFMPEG parameters
+    """
+    if quality not in _QUALITY_PARAMETERS:
+        raise Exception(f"Unknown quality {quality}")
+    parameters = {
+        "-c:v": "libx264",
+        "-pix_fmt": "yuv420p",
+        **_QUALITY_PARAMETERS[quality],
+    }
+    if quality == "realtime":
+        parameters["-g"] = str(max(1, round(target_fps * 2)))
+    return parameters
+
+
+@lru_cache(maxsize=None)
+def _check_executable(path: str, version_argument: str, name: str) -> None:
+    """
+    Method for checking that an executable can be run. Only successful checks are
+    cached, as the raised exception prevents caching.
+    :param path: path to the executable
+    :param version_argument: argument printing the version of the executable
+    :param name: name of the executable used in the error message
+    :return: None
+    """
+    try:
+        p = subprocess.run(
+            [path, version_argument],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        p = None
+    if p is None or p.returncode != 0:
+        raise Exception(f"Could not access {name} via given path")
+
+
+def _apply_callback(
+    frames: Iterable[Tuple[int, npt.NDArray[Any]]],
+    callback: Callable[[int, npt.NDArray[Any]], Any],
+    num_workers: int = 1,
+) -> Generator[Tuple[int, Any], None, None]:
+    """
+    Method for applying a post-processing callback to the frames, keeping the frame order
+    :param frames: index-image pairs to be post-processed
+    :param callback: callback method for post-processing the frames
+    :param num_workers: number of threads the callback is applied on in parallel (1 applies it on the calling thread)
+    :return: Generator of the indices and callback results in frame order
+    """
+    if num_workers <= 1:
+        for idx, img in frames:
+            yield idx, callback(idx, img)
+        return
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        pending = deque()
+        for idx, img in frames:
+            pending.append((idx, executor.submit(callback, idx, img)))
+            # only a few frames per worker are in flight, so that the video is not buffered as a whole
+            if len(pending) >= 2 * num_workers:
+                idx, future = pending.popleft()
+                yield idx, future.result()
+        while pending:
+            idx, future = pending.popleft()
+            yield idx, future.result()
+
+
+def _encode_png(idx: int, img: npt.NDArray[Any]) -> npt.NDArray[np.uint8]:
+    """
+    Method for encoding a frame as PNG image
+    :param idx: index of the frame
+    :param img: frame to be encoded
+    :return: bytes of the PNG image
+    """
+    success, encoded = cv2.imencode(".png", img)
+    if not success:
+        raise Exception(f"Could not encode frame {idx} as PNG")
+    return encoded
+
+
+def _get_partial_path(target_path: str) -> str:
+    """
+    Method for defining where FFMPEG writes the video until it is complete, so that a
+    failed write keeps an existing video at the target path
+    :param target_path: where to write the video
+    :return: path next to the target path with the same file extension
+    """
+    root, extension = os.path.splitext(target_path)
+    return f"{root}.part{extension}"
+
+
+def _write_raw(stream: BinaryIO, frame: npt.NDArray[Any]) -> None:
+    """
+    Method for writing the buffer of a frame to an unbuffered stream, which may accept only a part per call
+    :param stream: stream to be written to
+    :param frame: to be written
+    """
+    # every frame is handed over in a single call, coalescing frames would only add a copy of them;
+    # the stream is unbuffered, so no flush is needed, and a larger pipe buffer (F_SETPIPE_SZ) showed no gain
+    view = memoryview(np.ascontiguousarray(frame)).cast("B")
+    while view:
+        view = view[stream.write(view):]
+
+
 class AbstractVideoWriter(ABC):
     @abstractmethod
     def write(
@@ -77,6 +266,7 @@ class OpenCvVideoWriter(AbstractVideoWriter):
         target_fps: float = 29.97,
         fourcc: Tuple[str, str, str, str] = get_mp4v(),
         callback: Optional[Callable[[int, npt.NDArray[Any]], npt.NDArray[Any]]] = None,
+        callback_workers: int = 1,
     ) -> None:
         """
         Method for writing a video
@@ -85,27 +275,43 @@ class OpenCvVideoWriter(AbstractVideoWriter):
         :param target_fps: frames per seconds used to create the video
         :param fourcc: 	4-character code of codec used to compress the frames. (More information: https://docs.opencv.org/4.5.2/dd/d9e/classcv_1_1VideoWriter.html#ad59c61d8881ba2b2da22cff5487465b5 and https://softron.zendesk.com/hc/en-us/articles/207695697-List-of-FourCC-codes-for-video-codecs)
         :param callback: callback method for post-processing the frames before adding to video
+        :param callback_workers: number of threads the callback is applied on in parallel (the callback must be thread-safe if larger than 1)
         :return: None
         """
         writer = None
+        # contiguous copy of non-contiguous frames (e.g. views), reused to not allocate one per frame
+        buffer = None
+        if callback is not None:
+            frames = _apply_callback(frames, callback, callback_workers)
+        frames = iter(frames)
         try:
-            for (idx, frame) in frames:
-                if callback is not None:
-                    frame = callback(idx, frame)
-
-                if writer is None:
-                    shape = frame.shape
-                    height, width = shape[:2]
-                    writer = cv2.VideoWriter(
-                        target_path,
-                        cv2.VideoWriter_fourcc(
-                            fourcc[0], fourcc[1], fourcc[2], fourcc[3]
-                        ),
-                        target_fps,
-                        (width, height),
-                        len(shape) > 2 and shape[2] > 1,
-                    )
+            first = next(frames, None)
+            if first is None:
+                return
+            (idx, frame) = first
+
+            shape, dtype = frame.shape, frame.dtype
+            height, width = shape[:2]
+            writer = cv2.VideoWriter(
+                target_path,
+                cv2.VideoWriter_fourcc(fourcc[0], fourcc[1], fourcc[2], fourcc[3]),
+                target_fps,
+                (width, height),
+                len(shape) > 2 and shape[2] > 1,
+            )
+            while True:
+                _check_frame(idx, frame, shape, dtype)
+                if not frame.flags.c_contiguous:
+                    if buffer is None:
+                        buffer = np.empty(shape, dtype=dtype)
+                    np.copyto(buffer, frame)
+                    frame = buffer
                 writer.write(frame)
+
+                next_frame = next(frames, None)
+                if next_frame is None:
+                    break
+                (idx, frame) = next_frame
         finally:
             if writer is not None:
                 writer.release()
@@ -120,26 +326,75 @@ class AbstractFFMPEGVideoWriter(AbstractVideoWriter, ABC):
     def _get_process_command(
         self,
         target_fps: float,
-        outputformat: str,
-        pwd: str,
+        target_path: str,
+        pwd: Optional[str],
+        pixel_format: Optional[str],
+        video_size: Optional[str],
         parameters: Optional[List[Tuple[str, str]]] = None,
-    ) -> str:
+    ) -> List[str]:
+        """
+        :return: The arguments of the process that should be run, reading the frames from stdin
+        """
+        return []
+
+    def _needs_working_folder(self) -> bool:
+        """
+        :return: Flag if FFMPEG must be run in a temporary folder (passed as pwd)
+        """
+        return False
+
+    def _get_output_path(self, target_path: str, pwd: Optional[str]) -> str:
+        """
+        :return: The path of the video written by FFMPEG (copied to the target path if different)
+        """
+        return target_path
+
+    @staticmethod
+    def _get_input_list(
+        target_fps: float, pixel_format: Optional[str], video_size: Optional[str]
+    ) -> List[str]:
         """
-        :return: The process that should be run
+        Method for defining the stdin input of FFMPEG
+        :param target_fps: frames per seconds used to create the video
+        :param pixel_format: FFMPEG pixel format of raw frames (None if PNG images are piped)
+        :param video_size: size of raw frames (widthxheight)
+        :return: input parameter list
         """
-        return ""
+        if pixel_format is None:
+            return [
+                "-framerate",
+                str(target_fps),
+                "-f",
+                "image2pipe",
+                "-c:v",
+                "png",
+                "-i",
+                "-",
+            ]
+        return [
+            "-f",
+            "rawvideo",
+            "-pixel_format",
+            pixel_format,
+            "-video_size",
+            video_size,
+            "-framerate",
+            str(target_fps),
+            "-i",
+            "-",
+        ]
 
     @staticmethod
-    def _params_to_string(parameters: Optional[Dict[str, str]] = None) -> str:
+    def _params_to_list(parameters: Optional[Dict[str, str]] = None) -> List[str]:
         """
-        Method for combining the given parameters to a parameter string
-        :param parameters: to be combined
-        :return: parameter string
+        Method for flattening the given parameters to a parameter list
+        :param parameters: to be flattened
+        :return: parameter list
         """
         if parameters is None:
-            return ""
+            return []
         else:
-            return " ".join([f"{k} {v}" for k, v in parameters.items()])
+            return [str(x) for kv in parameters.items() for x in kv]
 
     def write_with_parameters(
         self,
@@ -148,6 +403,8 @@ class AbstractFFMPEGVideoWriter(AbstractVideoWriter, ABC):
         target_fps: float = 29.97,
         parameters: Optional[Dict[str, str]] = None,
         callback: Optional[Callable[[int, npt.NDArray[Any]], npt.NDArray[Any]]] = None,
+        pipe_png: bool = False,
+        callback_workers: int = 1,
     ) -> None:
         """
         Method for creating a video using ffmpeg
@@ -156,27 +413,69 @@ class AbstractFFMPEGVideoWriter(AbstractVideoWriter, ABC):
         :param target_fps: frames per seconds used to create the video
         :param parameters: FFMPEG parameters that should be used e.g. ("-pix_fmt", "yuva420p") for defining the pixel format
         :param callback: callback method for post-processing the frames before adding to video
+        :param pipe_png: Flag if the frames should be piped to FFMPEG as PNG images instead of raw frames (the raw frames need no encoding at all, so PNG is only intended for inputs FFMPEG should decode as PNG). The images are encoded on several threads, so the frames must not be modified after being generated
+        :param callback_workers: number of threads the callback is applied on in parallel (the callback must be thread-safe if larger than 1)
         :return: None
         """
-        temp_folder = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}")
-        os.makedirs(temp_folder, exist_ok=True)
+        temp_folder = None
+        if self._needs_working_folder():
+            temp_folder = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}")
+            os.makedirs(temp_folder, exist_ok=True)
+        # FFMPEG may be run in the temporary folder
+        partial_path = _get_partial_path(os.path.abspath(target_path))
+        p = None
+        success = False
         try:
+            if callback is not None:
+                frames = (
+                    (idx, img)
+                    for idx, (_, img) in _apply_callback(
+                        frames, callback, callback_workers
+                    )
+                )
+            if pipe_png:
+                frames = _apply_callback(frames, _encode_png, _PNG_ENCODE_WORKERS)
             for idx, img in frames:
-                if callback is not None:
-                    _, img = callback(idx, img)
-                cv2.imwrite(os.path.join(temp_folder, f"{idx}.png"), img)
-
-            outputformat = pathlib.Path(target_path).suffix
-            p = self._get_process_command(
-                target_fps, outputformat, temp_folder, parameters
-            )
-            subprocess.run(p, cwd=temp_folder)
-
-            shutil.copyfile(
-                os.path.join(temp_folder, f"output{outputformat}"), target_path
-            )
+                if p is None:
+                    # the raw input is described by the first frame
+                    pixel_format, video_size = (
+                        (None, None) if pipe_png else get_raw_input(img)
+                    )
+                    shape, dtype = img.shape, img.dtype
+                    p_cmd = self._get_process_command(
+                        target_fps,
+                        partial_path,
+                        temp_folder,
+                        pixel_format,
+                        video_size,
+                        parameters,
+                    )
+                    p = subprocess.Popen(p_cmd, cwd=temp_folder, stdin=subprocess.PIPE)
+                if pipe_png:
+                    p.stdin.write(memoryview(img).cast("B"))
+                else:
+                    _check_frame(idx, img, shape, dtype)
+                    # contiguous frames are written without a copy
+                    p.stdin.write(memoryview(np.ascontiguousarray(img)).cast("B"))
+            if p is None:
+                raise Exception("No frames to write")
+            p.stdin.close()
+            if p.wait() != 0:
+                raise Exception(f"FFMPEG failed with exit code {p.returncode}")
+
+            output_path = self._get_output_path(partial_path, temp_folder)
+            if output_path != partial_path:
+                shutil.copyfile(output_path, partial_path)
+            os.replace(partial_path, target_path)
+            success = True
         finally:
-            shutil.rmtree(temp_folder)
+            if p is not None and p.poll() is None:
+                p.kill()
+                p.wait()
+            if not success and os.path.exists(partial_path):
+                os.remove(partial_path)
+            if temp_folder is not None:
+                shutil.rmtree(temp_folder)
 
     def write(
         self,
@@ -184,12 +483,22 @@ class AbstractFFMPEGVideoWriter(AbstractVideoWriter, ABC):
         frames: Generator[Tuple[int, npt.NDArray[Any]], None, None],
         target_fps: float = 29.97,
         callback: Optional[Callable[[int, npt.NDArray[Any]], npt.NDArray[Any]]] = None,
+        quality: Quality = "realtime",
     ) -> None:
+        """
+        Method for writing a H.264 video
+        :param target_path: where to write the video
+        :param frames: to be written
+        :param target_fps: frames per seconds used to create the video
+        :param callback: callback method for post-processing the frames before adding to video
+        :param quality: trade-off between encoding speed and file size (see ``get_h264_parameters``)
+        :return: None
+        """
         self.write_with_parameters(
             target_path,
             frames,
             target_fps,
-            {"-c:v": "libx264", "-pix_fmt": "yuv420p"},
+            get_h264_parameters(target_fps, quality),
             callback,
         )
 
@@ -208,23 +517,32 @@ class FFMPEGWriter(AbstractFFMPEGVideoWriter):
         else:
             self.__path_to_ffmpeg = "ffmpeg"
 
-        p = subprocess.run(f"{self.__path_to_ffmpeg} -version")
-        if p.returncode != 0:
-            raise Exception("Could not access FFMPEG via given path")
+        _check_executable(self.__path_to_ffmpeg, "-version", "FFMPEG")
+
+    @property
+    def path_to_ffmpeg(self) -> str:
+        """
+        :return: The path to the FFMPEG executable used by this writer
+        """
+        return self.__path_to_ffmpeg
 
     def _get_process_command(
         self,
         target_fps: float,
-        outputformat: str,
-        pwd: str,
+        target_path: str,
+        pwd: Optional[str],
+        pixel_format: Optional[str],
+        video_size: Optional[str],
         parameters: Optional[Dict[str, str]] = None,
-    ) -> str:
+    ) -> List[str]:
         """
-        :return: The process that should be run
+        :return: The arguments of the process that should be run
         """
-        params = self._params_to_string(parameters)
+        params = self._params_to_list(parameters)
+
+        input_list = self._get_input_list(target_fps, pixel_format, video_size)
 
-        return f"{self.__path_to_ffmpeg} -framerate {target_fps} -f image2 -i %d.png {params} output{outputformat}"
+        return [self.__path_to_ffmpeg, *input_list, *params, "-y", target_path]
 
 
 class DockerFFMPEGWriter(AbstractFFMPEGVideoWriter):
@@ -254,22 +572,46 @@ class DockerFFMPEGWriter(AbstractFFMPEGVideoWriter):
         else:
             self.__path_to_docker = "docker"
 
-        p = subprocess.run(f"{self.__path_to_docker} --version")
-        if p.returncode != 0:
-            raise Exception("Could not access Docker via given path")
+        _check_executable(self.__path_to_docker, "--version", "Docker")
+
+    def _needs_working_folder(self) -> bool:
+        """
+        :return: True, as the temporary folder is mounted into the container
+        """
+        return True
+
+    def _get_output_path(self, target_path: str, pwd: Optional[str]) -> str:
+        """
+        :return: The video written to the mounted folder, as the container cannot access the target path
+        """
+        return os.path.join(pwd, f"output{pathlib.Path(target_path).suffix}")
 
     def _get_process_command(
         self,
         target_fps: float,
-        outputformat: str,
-        pwd: str,
+        target_path: str,
+        pwd: Optional[str],
+        pixel_format: Optional[str],
+        video_size: Optional[str],
         parameters: Optional[Dict[str, str]] = None,
-    ) -> str:
+    ) -> List[str]:
         """
-        :return: The process that should be run
+        :return: The arguments of the process that should be run
         """
-        runtime = ""
-        parameters_copy = parameters.copy()
+        outputformat = pathlib.Path(target_path).suffix
+        runtime: List[str] = []
+        device_options: List[str] = []
+        parameters_copy = parameters.copy() if parameters is not None else {}
+        # the software H.264 encoder is replaced by the encoder of the hardware (other codecs are kept)
+        use_hardware_encoder = parameters_copy.get("-c:v") == "libx264"
+        if (
+            use_hardware_encoder
+            and self.__use_hardware_acceleration
+            != DockerFFMPEGWriter.HardwareAcceleration.No
+        ):
+            # the presets and tunings of libx264 are unknown to the hardware encoders
+            parameters_copy.pop("-preset", None)
+            parameters_copy.pop("-tune", None)
 
         if (
             self.__use_hardware_acceleration
@@ -281,14 +623,42 @@ class DockerFFMPEGWriter(AbstractFFMPEGVideoWriter):
             == DockerFFMPEGWriter.HardwareAcceleration.Docker
         ):
             docker_image = "jrottenberg/ffmpeg:5.0.2-vaapi2004"
+            runtime = ["--device", "/dev/dri:/dev/dri"]
+            if use_hardware_encoder:
+                device_options = ["-vaapi_device", "/dev/dri/renderD128"]
+                # the frames are uploaded in a pixel format of the encoder, which defines the output format
+                parameters_copy.pop("-pix_fmt", None)
+                filters = parameters_copy.get("-vf")
+                parameters_copy["-vf"] = (
+                    "format=nv12,hwupload"
+                    if filters is None
+                    else f"{filters},format=nv12,hwupload"
+                )
+                parameters_copy["-c:v"] = "h264_vaapi"
         else:
             docker_image = "jrottenberg/ffmpeg:5.0.2-nvidia2004"
-            runtime = "--runtime=nvidia"
-            parameters_copy["-hwaccel"] = "cuvid"
-
-        params = self._params_to_string(parameters_copy)
-
-        return f"{self.__path_to_docker} run {runtime} -v {pwd}:/images/ {docker_image} -framerate {target_fps} -f image2 -i /images/%d.png {params} /images/output{outputformat}"
+            runtime = ["--runtime=nvidia"]
+            if use_hardware_encoder:
+                parameters_copy["-c:v"] = "h264_nvenc"
+                parameters_copy["-preset"] = "p4"
+                parameters_copy["-tune"] = "ll"
+
+        params = self._params_to_list(parameters_copy)
+        input_list = self._get_input_list(target_fps, pixel_format, video_size)
+
+        return [
+            self.__path_to_docker,
+            "run",
+            "-i",
+            *runtime,
+            "-v",
+            f"{pwd}:/images/",
+            docker_image,
+            *device_options,
+            *input_list,
+            *params,
+            f"/images/output{outputformat}",
+        ]
 
 
 class WebmFFMPEGWriter(AbstractVideoWriter):
@@ -306,6 +676,7 @@ class WebmFFMPEGWriter(AbstractVideoWriter):
         target_fps: float = 29.97,
         parameters: Optional[Dict[str, str]] = None,
         callback: Optional[Callable[[int, npt.NDArray[Any]], npt.NDArray[Any]]] = None,
+        callback_workers: int = 1,
     ) -> None:
         if not target_path.endswith(".webm"):
             raise Exception("Target Path does not end with file subfix .webm")
@@ -319,7 +690,12 @@ class WebmFFMPEGWriter(AbstractVideoWriter):
         if param_copy.get("-pix_fmt") is None:
             param_copy["-pix_fmt"] = "yuva420p"
         self._base_writer.write_with_parameters(
-            target_path, frames, target_fps, param_copy, callback
+            target_path,
+            frames,
+            target_fps,
+            param_copy,
+            callback,
+            callback_workers=callback_workers,
         )
 
     def write(
@@ -355,21 +731,38 @@ class PipeFFMPEGWriter(AbstractVideoWriter):
             self.out = sys.stdout
             self.err = sys.stderr
 
-        p = subprocess.run(f"{self.__path_to_ffmpeg} -version", stdout=self.out, stderr=self.err)
-        if p.returncode != 0:
-            raise Exception("Could not access FFMPEG via given path")
+        _check_executable(self.__path_to_ffmpeg, "-version", "FFMPEG")
 
-    def _get_command_list(self, target_fps: float, outputformat: str, parameters: dict[str, str]):
+    def _get_command_list(self, target_fps: float, target_path: str, pixel_format: str, video_size: str,
+                          parameters: Optional[dict[str, str]]):
 
-        param_list = [self.__path_to_ffmpeg, "-framerate", str(target_fps), "-f", "image2pipe", "-i", "-"]
+        param_list = [self.__path_to_ffmpeg, "-f", "rawvideo", "-pixel_format", pixel_format, "-video_size", video_size,
+                      "-framerate", str(target_fps), "-i", "-"]
 
-        for k, v in parameters.items():
+        for k, v in (parameters or {}).items():
             param_list.append(k)
             param_list.append(str(v))
 
-        param_list.append(f"output{outputformat}")
+        param_list.append("-y")
+        param_list.append(target_path)
         return param_list
 
+    @staticmethod
+    def _pump(stream: BinaryIO, frame_queue: queue.Queue, errors: List[BaseException]) -> None:
+        """
+        Writes the queued frames to FFMPEG until None is queued. After a failed write the remaining frames are discarded,
+        so that the producer never blocks on the queue.
+        :param stream: stdin of FFMPEG
+        :param frame_queue: frames to be written
+        :param errors: receives the exception of a failed write
+        """
+        while (frame := frame_queue.get()) is not None:
+            if not errors:
+                try:
+                    _write_raw(stream, frame)
+                except Exception as e:  # pylint: disable=W0703
+                    errors.append(e)
+
     def write_with_parameters(
             self,
             target_path: str,
@@ -377,45 +770,87 @@ class PipeFFMPEGWriter(AbstractVideoWriter):
             target_fps: float = 29.97,
             parameters: Optional[dict[str, str]] = None,
             callback: Optional[Callable[[int, npt.NDArray[Any]], npt.NDArray[Any]]] = None,
+            callback_workers: int = 1,
+            convert_yuv420p: bool = True,
     ) -> None:
         """
-        Creates a video from frames using FFMPEG and the 'image2pipe' input. FFMPEG encodes the video parallel to the
-        image generation.
+        Creates a video from frames using FFMPEG and a raw video input. FFMPEG encodes the video parallel to the image
+        generation. The frames are written by a separate thread, so they must not be modified after being generated.
         :param target_path: where to write the video
         :param frames: a generator producing index-image pairs representing the frames to be written. The images are
         assumed to be produced in frame order, no additional ordering based on the index is performed.
         :param target_fps: frames per seconds used to create the video
         :param parameters: FFMPEG parameters that should be used e.g. ("-pix_fmt", "yuva420p") for defining the pixel format
         :param callback: callback method for post-processing the frames before adding to video
+        :param callback_workers: number of threads the callback is applied on in parallel (the callback must be
+        thread-safe if larger than 1)
+        :param convert_yuv420p: Flag if 8-bit BGR(A) frames should be converted by OpenCV if the video is encoded as
+        yuv420p. This halves the bytes piped to FFMPEG and replaces its slower conversion (requires even frame sizes).
         :return: None
         """
-        temp_folder = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}")
-        os.makedirs(temp_folder, exist_ok=True)
+        partial_path = _get_partial_path(target_path)
         p = None
+        pump = None
+        conversion = None
+        success = False
+        frame_queue: queue.Queue = queue.Queue(maxsize=_FRAME_QUEUE_SIZE)
+        errors: List[BaseException] = []
         try:
-            outputformat = pathlib.Path(target_path).suffix
-            p_cmd = self._get_command_list(target_fps, outputformat, parameters)
-            p = subprocess.Popen(p_cmd, cwd=temp_folder, stdin=subprocess.PIPE, stdout=self.out, stderr=self.err)
+            if callback is not None:
+                frames = ((idx, img) for idx, (_, img) in _apply_callback(frames, callback, callback_workers))
 
             for idx, img in frames:
-                if callback is not None:
-                    _, img = callback(idx, img)
-                img_bytes = cv2.imencode('.bmp', img)[1].tostring()
-                p.stdin.write(img_bytes)
-                p.stdin.flush()
-                del img
-                del img_bytes
+                if p is None:
+                    # the raw input is described by the first frame
+                    pixel_format, video_size = get_raw_input(img)
+                    shape, dtype = img.shape, img.dtype
+                    if (
+                        convert_yuv420p
+                        and parameters is not None
+                        and parameters.get("-pix_fmt") == "yuv420p"
+                        and dtype == np.uint8
+                        and len(shape) == 3
+                        and shape[0] % 2 == 0
+                        and shape[1] % 2 == 0
+                    ):
+                        conversion = _YUV420P_CONVERSIONS.get(shape[2])
+                        if conversion is not None:
+                            pixel_format = "yuv420p"
+                    p_cmd = self._get_command_list(target_fps, partial_path, pixel_format, video_size, parameters)
+                    # unbuffered, as the frames are written at once
+                    p = subprocess.Popen(p_cmd, stdin=subprocess.PIPE, stdout=self.out,
+                                         stderr=self.err, bufsize=0)
+                    pump = threading.Thread(target=self._pump, args=(p.stdin, frame_queue, errors))
+                    pump.start()
+                if errors:
+                    raise errors[0]
+                _check_frame(idx, img, shape, dtype)
+                if conversion is not None:
+                    img = cv2.cvtColor(img, conversion)
+                frame_queue.put(img)
+            if pump is not None:
+                frame_queue.put(None)
+                pump.join()
+                pump = None
+                if errors:
+                    raise errors[0]
+            if p is None:
+                raise Exception("No frames to write")
             p.stdin.close()
-            p.wait()
-
-            shutil.copyfile(
-                os.path.join(temp_folder, f"output{outputformat}"), target_path
-            )
+            if p.wait() != 0:
+                raise Exception(f"FFMPEG failed with exit code {p.returncode}")
+            os.replace(partial_path, target_path)
+            success = True
         finally:
-            if p is not None and not p.poll():
-                p.stdin.close()
+            # FFMPEG is killed instead of finishing an incomplete video, which also ends a pending write of the pump
+            if p is not None and p.poll() is None:
+                p.kill()
                 p.wait()
-            shutil.rmtree(temp_folder)
+            if pump is not None:
+                frame_queue.put(None)
+                pump.join()
+            if not success and os.path.exists(partial_path):
+                os.remove(partial_path)
 
     def write(
             self,
@@ -423,12 +858,22 @@ class PipeFFMPEGWriter(AbstractVideoWriter):
             frames: Generator[Tuple[int, npt.NDArray[Any]], None, None],
             target_fps: float = 29.97,
             callback: Optional[Callable[[int, npt.NDArray[Any]], npt.NDArray[Any]]] = None,
+            quality: Quality = "realtime",
     ) -> None:
+        """
+        Method for writing a H.264 video
+        :param target_path: where to write the video
+        :param frames: to be written
+        :param target_fps: frames per seconds used to create the video
+        :param callback: callback method for post-processing the frames before adding to video
+        :param quality: trade-off between encoding speed and file size (see ``get_h264_parameters``)
+        :return: None
+        """
         self.write_with_parameters(
             target_path,
             frames,
             target_fps,
-            {"-c:v": "libx264", "-pix_fmt": "yuv420p"},
+            get_h264_parameters(target_fps, quality),
             callback,
         )
 
@@ -436,13 +881,18 @@ class PipeFFMPEGWriter(AbstractVideoWriter):
 if __name__ == '__main__':
     mypath = r"C:\Users\P41743\Desktop\res"
 
-    onlyfiles = [f for f in os.listdir(mypath) if f.endswith(".png")]
-    def sort_function(string: str):
-        return int(Path(string).stem)
-
-    onlyfiles.sort(key=sort_function)
+    with os.scandir(mypath) as entries:
+        onlyfiles = sorted((entry.path for entry in entries if entry.name.endswith(".png")),
+                           key=lambda path: int(os.path.basename(path)[:-4]))
 
     writer = FFMPEGWriter()
     video_path = os.path.join(mypath, "video.mp4")
-    gen = ((idx, cv2.imread(x)) for (idx, x) in enumerate(onlyfiles))
-    writer.write(video_path, gen)
\ No newline at end of file
+    numbers = [int(os.path.basename(path)[:-4]) for path in onlyfiles]
+    if numbers and numbers == list(range(numbers[0], numbers[0] + len(numbers))):
+        # consecutively numbered images are read by FFMPEG directly instead of being decoded and piped
+        demo_params = [str(x) for kv in get_h264_parameters(29.97).items() for x in kv]
+        subprocess.run([writer.path_to_ffmpeg, "-framerate", "29.97", "-start_number", str(numbers[0]),
+                        "-i", "%d.png", *demo_params, "-y", video_path], cwd=mypath, check=True)
+    else:
+        gen = ((idx, cv2.imread(x, cv2.IMREAD_COLOR)) for (idx, x) in enumerate(onlyfiles))
+        writer.write(video_path, gen)